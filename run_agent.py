@@ -62,6 +62,8 @@ def main():
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
@@ -1,21 +1,217 @@
 """Core agent implementation using guidance-ai."""
 
-from typing import Any, Optional
-import json
-import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from functools import lru_cache
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Mapping, Optional
+import hashlib
 import platform
+import sys
 
 import guidance
+import orjson
 from guidance import gen, select, system, user, assistant
 from loguru import logger
-from pydantic import BaseModel
 
 from .config import Settings
 from .llm import LLMEngine
 from .tools import InternetTool, TerminalTool, ToolResult
 
 
-class Task(BaseModel):
+_TOOL_CALL_START = "<|tool_call_start|>"
+_TOOL_CALL_END = "<|tool_call_end|>"
+
+# Longest tool output fed back to the model in the follow-up turn
+_MAX_TOOL_RESPONSE_CHARS = 1500
+
+
+def _is_word_char(ch: str) -> bool:
+    """Match the regex \\w class for a single character."""
+    return ch.isalnum() or ch == "_"
+
+
+def _skip_whitespace(text: str, i: int) -> int:
+    """Return the first index at or after i that is not whitespace."""
+    while i < len(text) and text[i].isspace():
+        i += 1
+    return i
+
+
+def _closing_quote(text: str, start: int) -> int:
+    """Return the index of the quote closing the string opened at start, or -1."""
+    quote = text[start]
+    i = start + 1
+    while True:
+        i = text.find(quote, i)
+        if i == -1:
+            return -1
+        # Escaped if preceded by an odd number of backslashes
+        backslashes = 0
+        while text[i - 1 - backslashes] == "\\":
+            backslashes += 1
+        if backslashes % 2 == 0:
+            return i
+        i += 1
+
+
+def _scan_arguments(text: str, open_paren: int) -> Optional[tuple[int, dict[str, str]]]:
+    """Read key="value" / key='value' arguments up to the closing ")]".
+    
+    Quotes only delimit values: one anywhere else (an apostrophe in
+    "[note(don't)]") is an ordinary character.
+    
+    Args:
+        text: Response text
+        open_paren: Index of the "(" after the function name
+        
+    Returns:
+        Index just past the closing "]" and the arguments, or None if a
+        value's quote or the call itself is never closed
+    """
+    args = {}
+    i = open_paren + 1
+    n = len(text)
+    
+    while i < n:
+        ch = text[i]
+        if ch == ")" and text.startswith("]", i + 1):
+            return i + 2, args
+        
+        if _is_word_char(ch):
+            key_end = i + 1
+            while key_end < n and _is_word_char(text[key_end]):
+                key_end += 1
+            
+            value_start = _skip_whitespace(text, key_end)
+            if value_start < n and text[value_start] == "=":
+                value_start = _skip_whitespace(text, value_start + 1)
+                if value_start < n and text[value_start] in "\"'":
+                    end = _closing_quote(text, value_start)
+                    if end == -1:
+                        return None
+                    args[sys.intern(text[i:key_end])] = text[value_start + 1:end]
+                    key_end = end + 1
+            i = key_end
+        else:
+            i += 1
+    
+    return None
+
+
+def _scan_tool_calls(text: str) -> list[tuple[bool, str, dict[str, str]]]:
+    """Find [func(key="value")] calls, scanning left to right.
+    
+    str.find jumps between "[" candidates; only the call itself is walked
+    character by character, tracking quoted values, so a ")]" inside an
+    argument does not end the call. Well-formed text is walked once; a
+    call that never closes is dropped and the scan resumes at the next "["
+    after it, which can rescan its text.
+    
+    Args:
+        text: Response text
+        
+    Returns:
+        (wrapped, name, args) per call, where wrapped means the call sits
+        between <|tool_call_start|> and <|tool_call_end|>. Names and
+        argument keys are interned, so lookups against the literal tool
+        and parameter names compare by identity
+    """
+    calls = []
+    n = len(text)
+    i = text.find("[")
+    
+    while i != -1:
+        name_end = i + 1
+        while name_end < n and _is_word_char(text[name_end]):
+            name_end += 1
+        open_paren = _skip_whitespace(text, name_end)
+        
+        if name_end == i + 1 or open_paren >= n or text[open_paren] != "(":
+            i = text.find("[", i + 1)
+            continue
+        
+        scanned = _scan_arguments(text, open_paren)
+        if scanned is None:
+            # Not a call, but a later "[" may start one (possibly inside the
+            # unterminated value); none can close without a ")]" after it
+            if text.find(")]", i) == -1:
+                break
+            i = text.find("[", i + 1)
+            continue
+        
+        end, args = scanned
+        before = i
+        while before > 0 and text[before - 1].isspace():
+            before -= 1
+        wrapped = (
+            text.startswith(_TOOL_CALL_START, before - len(_TOOL_CALL_START))
+            and text.startswith(_TOOL_CALL_END, _skip_whitespace(text, end))
+        )
+        calls.append((wrapped, sys.intern(text[i + 1:name_end]), args))
+        i = text.find("[", end)
+    
+    return calls
+
+
+@lru_cache(maxsize=1024)
+def _cached_tool_calls(text: str) -> tuple[tuple[bool, "ToolCall"], ...]:
+    """Memoized _scan_tool_calls, as (wrapped, ToolCall) pairs.
+    
+    Parsing only depends on the text, and the same responses come back
+    (replayed from the agent's response cache, on retries, in tests), so
+    those skip the scan. ToolCalls are immutable, so cached entries are
+    handed out as they are.
+    """
+    return tuple((wrapped, ToolCall(name, args)) for wrapped, name, args in _scan_tool_calls(text))
+
+
+# Tool turns under tool_call_mode="grammar": exactly one well-formed tool call,
+# or a plain answer that does not start like a tool call
+TOOL_CALL_GRAMMAR = r'''
+root     ::= toolcall | answer
+toolcall ::= "<|tool_call_start|>[" call ")]<|tool_call_end|>"
+call     ::= "terminal(command=" string | "internet(url=" string
+string   ::= "\"" ( [^"\\\n] | "\\" [^\n] )* "\""
+answer   ::= [^<\[] [^<]*
+'''
+
+@guidance
+def tool_call_program(lm, prompt: str, temperature: float):
+    """Tool turn under tool_call_mode="guidance": pick a tool, then its argument or an answer."""
+    lm += prompt + "Tool: " + select(["terminal", "internet", "done"], name="tool")
+    if lm["tool"] == "done":
+        lm += "\n" + gen("answer", stop="<|im_end|>", max_tokens=300, temperature=temperature)
+    else:
+        lm += ' Argument: "' + gen(
+            "argument", regex=r'[^"\n]+', max_tokens=200, temperature=temperature
+        ) + '"'
+    return lm
+
+
+# Per-task user message; only the task description changes between steps
+_USER_MESSAGE_TEMPLATE = """Task: {description}
+
+INSTRUCTIONS:
+1. If you need to run a command, use: <|tool_call_start|>[terminal(command="your command")]<|tool_call_end|>
+2. If you need to fetch a URL, use: <|tool_call_start|>[internet(url="https://example.com")]<|tool_call_end|>
+3. If a tool returns an error, READ IT and adapt your approach (e.g., Windows vs Linux commands)
+4. If task is complete, just explain the result.
+
+COMMON COMMANDS BY OPERATING SYSTEM:
+- List files: Windows = "dir", Linux/Mac = "ls"
+- Show file content: Windows = "type filename", Linux/Mac = "cat filename"
+- Current directory: Windows = "cd", Linux/Mac = "pwd"
+
+If you see error "not recognized as internal or external command", you are on Windows - use Windows commands!
+
+Always use the tool call format above. Do not write URLs or commands in plain text - wrap them in tool calls.
+Do not repeat commands that already failed - try different commands based on the error message."""
+
+
+@dataclass(slots=True)
+class Task:
     """A task in the agent's task list."""
     
     id: int
@@ -23,7 +219,8 @@ class Task(BaseModel):
     status: str = "pending"  # pending, in-progress, completed, failed
 
 
-class ReasoningStep(BaseModel):
+@dataclass(slots=True)
+class ReasoningStep:
     """A step in the reasoning process."""
     
     thought: str
@@ -31,6 +228,31 @@ class ReasoningStep(BaseModel):
     observation: Optional[str] = None
 
 
+@dataclass(slots=True, frozen=True)
+class ToolCall:
+    """A tool call parsed from a model response.
+    
+    Arguments are stored as (key, value) pairs, so calls hash, compare and
+    go through asdict() like the other dataclasses; args reads them as a
+    read-only mapping. A mapping passed as arguments is converted.
+    """
+    
+    name: str
+    arguments: tuple[tuple[str, str], ...] = ()
+    # Built once so args only wraps it; not part of equality or the hash
+    _args: dict[str, str] = field(init=False, repr=False, compare=False)
+    
+    def __post_init__(self):
+        if isinstance(self.arguments, Mapping):
+            object.__setattr__(self, "arguments", tuple(self.arguments.items()))
+        object.__setattr__(self, "_args", dict(self.arguments))
+    
+    @property
+    def args(self) -> Mapping[str, str]:
+        """Arguments by name, read-only."""
+        return MappingProxyType(self._args)
+
+
 class Agent:
     """AI Agent with reasoning, task management, and tool use.
     
@@ -77,26 +299,67 @@ class Agent:
         
         Args:
             settings: Application settings
-            self.os_type = platform.system()  # 'Windows', 'Linux', 'Darwin'
-            self.is_windows = self.os_type == 'Windows'
         """
         self.settings = settings
+        self.os_type = platform.system()  # 'Windows', 'Linux', 'Darwin'
+        self.is_windows = self.os_type == 'Windows'
         self.llm_engine = LLMEngine(settings)
-        self.terminal_tool = TerminalTool(enabled=settings.enable_terminal)
+        self.terminal_tool = TerminalTool(enabled=settings.enable_terminal, persistent=True)
         self.internet_tool = InternetTool(enabled=settings.enable_internet)
         
         self.tasks: list[Task] = []
         self.reasoning_steps: list[ReasoningStep] = []
         self.iteration_count = 0
+        self._system_tokens: list[int] = []
+        self._response_cache: dict[str, str] = {}  # sha256(conversation) -> response
+        
+        # The system prompt only depends on the OS and the static tool list
+        self._tools_json = orjson.dumps(
+            self.TOOLS_DEFINITION, option=orjson.OPT_INDENT_2
+        ).decode("utf-8")
+        self._system_prompt_cached = self._build_system_prompt()
+        self._tool_params = {
+            tool["name"]: tool["parameters"]["required"][0] for tool in self.TOOLS_DEFINITION
+        }
+        self._guidance_model: Optional[guidance.models.Model] = None  # built on first use
+        self._executor: Optional[ThreadPoolExecutor] = None  # started on first use
         
     def load(self) -> None:
         """Load the agent (model and configuration)."""
         logger.info("Loading agent...")
         self.llm_engine.load_model()
+        self._prefill_system_prompt()
         logger.info("Agent loaded successfully")
     
+    def _prefill_system_prompt(self) -> None:
+        """Evaluate the static system prompt once to seed the KV cache.
+        
+        llama.cpp keeps the KV cache between calls and only evaluates the
+        suffix that differs from the cached tokens, so every prompt built on
+        top of the system prompt reuses this prefill instead of repeating it.
+        Every prompt the agent generates from (the task list included) must
+        start with the system prompt: one that does not evicts this prefill
+        before the next reasoning step can use it.
+        The resulting state is saved to model_kv_state_path so later
+        processes can restore it instead of prefilling again.
+        """
+        prompt = self._get_system_prompt()
+        state_path = self.settings.model_kv_state_path
+        
+        if state_path and self.llm_engine.load_state(state_path, prompt):
+            self._system_tokens = list(self.llm_engine.model.eval_tokens)
+        else:
+            self._system_tokens = self.llm_engine.prefill(prompt)
+            if state_path:
+                self.llm_engine.save_state(state_path, prompt)
+        logger.debug("Cached {} system prompt tokens", len(self._system_tokens))
+    
     def _get_system_prompt(self) -> str:
         """Get system prompt with OS-specific command guidance."""
+        return self._system_prompt_cached
+    
+    def _build_system_prompt(self) -> str:
+        """Build the system prompt with OS-specific command guidance."""
         os_name = "Windows" if self.is_windows else "Linux/Mac"
         
         # Provide OS-specific command mappings
@@ -117,7 +380,6 @@ class Agent:
     - Make dir: mkdir dirname
     - Remove file: rm filename.txt"""
         
-        tools_json = json.dumps(self.TOOLS_DEFINITION, indent=2)
         return f"""<|im_start|>system
     You are a helpful AI assistant with access to tools for executing commands and fetching data.
 
@@ -125,7 +387,7 @@ class Agent:
     {cmd_examples}
 
     Available tools:
-    <|tool_list_start|>{tools_json}<|tool_list_end|>
+    <|tool_list_start|>{self._tools_json}<|tool_list_end|>
 
     When you need to use a tool, write a function call in this format:
     <|tool_call_start|>[terminal(command="dir")]<|tool_call_end|>
@@ -133,7 +395,31 @@ class Agent:
 
     Use {os_name}-specific commands. Do not use commands from other operating systems.<|im_end|>"""
     
-    def _parse_tool_calls(self, response: str) -> list[dict]:
+    def _guided_tool_turn(self, prompt: str) -> str:
+        """Generate a tool turn with the guidance tool_call_program.
+        
+        The guidance model wrapper is created the first time it is needed.
+        
+        Args:
+            prompt: Prompt ending with the assistant marker
+            
+        Returns:
+            The final answer, or the chosen tool call in LFM2.5 format
+        """
+        if self._guidance_model is None:
+            self._guidance_model = guidance.models.LlamaCpp(self.llm_engine.model, echo=False)
+        
+        result = self._guidance_model + tool_call_program(prompt, self.settings.model_temperature)
+        
+        tool = result["tool"]
+        if tool == "done":
+            return result["answer"]
+        return (
+            f'<|tool_call_start|>[{tool}({self._tool_params[tool]}="{result["argument"]}")]'
+            f'<|tool_call_end|>'
+        )
+    
+    def _parse_tool_calls(self, response: str) -> list[ToolCall]:
         """Parse tool calls from LFM2.5 response format.
         
         Handles multiple formats:
@@ -146,117 +432,40 @@ class Agent:
             response: Response text containing tool calls
             
         Returns:
-            List of tool call dictionaries with name and arguments
+            Tool calls to defined tools, in order
         """
+        # Every call starts with "[": plain answers (and empty ones) return
+        # before the cache lookup or the scan, and don't take cache slots
+        if "[" not in response:
+            return []
+        
         tool_calls = []
         
-        # Try format with markers first
-        pattern = r'<\|tool_call_start\|\>\s*\[(.*?)\]\s*<\|tool_call_end\|\>'
-        matches = re.findall(pattern, response, re.DOTALL)
-        
-        # If no matches with markers, try without markers
-        if not matches:
-            # Look for [function_name(args)] format anywhere in text
-            # This handles nested quotes by using a more sophisticated pattern
-            pattern = r'\[(\w+)\s*\((.*?)\)\]'
-            matches_raw = re.findall(pattern, response, re.DOTALL)
-            # Reformat matches to be consistent
-            reformatted = []
-            for func_name, args_str in matches_raw:
-                reformatted.append(f"{func_name}({args_str})")
-            matches = reformatted
-        
-        for match in matches:
-            # Parse Pythonic function call
-            # E.g.: terminal(command="ls -la") or internet(url="http://...")
-            # Use a more robust regex that handles nested quotes
-            func_pattern = r'(\w+)\s*\((.*)\)'
-            func_match = re.match(func_pattern, match.strip() if isinstance(match, str) else match[0], re.DOTALL)
-            
-            if func_match:
-                func_name = func_match.group(1)
-                args_str = func_match.group(2)
-                
-                # Parse arguments - handle nested quotes properly
-                args = {}
-                # Match key="value" where value can contain single quotes
-                # Pattern: word followed by = then quoted string (possibly with inner quotes)
-                arg_pattern = r'(\w+)\s*=\s*"([^"]*(?:\'[^"]*\')*[^"]*)"|(\w+)\s*=\s*\'([^\']*)\'|(\w+)\s*=\s*\'([^\']*)\'(?:[^"\']|"[^"]*")*\''
-                
-                # Better approach: find all key=value pairs by tracking quotes properly
-                i = 0
-                while i < len(args_str):
-                    # Skip whitespace and commas
-                    while i < len(args_str) and args_str[i] in ' ,\t\n':
-                        i += 1
-                    
-                    if i >= len(args_str):
-                        break
-                    
-                    # Extract key
-                    key_start = i
-                    while i < len(args_str) and (args_str[i].isalnum() or args_str[i] == '_'):
-                        i += 1
-                    
-                    if i >= len(args_str):
-                        break
-                    
-                    key = args_str[key_start:i].strip()
-                    
-                    # Skip whitespace and =
-                    while i < len(args_str) and args_str[i] in ' \t\n':
-                        i += 1
-                    
-                    if i >= len(args_str) or args_str[i] != '=':
-                        break
-                    
-                    i += 1  # skip =
-                    
-                    # Skip whitespace after =
-                    while i < len(args_str) and args_str[i] in ' \t\n':
-                        i += 1
-                    
-                    if i >= len(args_str):
-                        break
-                    
-                    # Extract value (handle both double and single quotes)
-                    quote_char = args_str[i]
-                    if quote_char not in ('"', "'"):
-                        break
-                    
-                    i += 1  # skip opening quote
-                    value_start = i
-                    
-                    # Find closing quote, handling escaped quotes
-                    while i < len(args_str):
-                        if args_str[i] == quote_char and (i == 0 or args_str[i-1] != '\\'):
-                            break
-                        i += 1
-                    
-                    value = args_str[value_start:i]
-                    args[key] = value
-                    i += 1  # skip closing quote
-                
-                if func_name in ["terminal", "internet"]:
-                    tool_calls.append({
-                        "name": func_name,
-                        "args": args
-                    })
-                    logger.debug(f"Parsed tool call: {func_name}({args})")
+        # One scan finds wrapped and bare calls; wrapped calls take precedence
+        found = _cached_tool_calls(response)
+        wrapped = [call for call in found if call[0]]
+        
+        for _, tool_call in wrapped or found:
+            if tool_call.name in self._tool_params:  # a defined tool
+                tool_calls.append(tool_call)
+                logger.opt(lazy=True).debug(
+                    "Parsed tool call: {}({})",
+                    lambda: tool_call.name, lambda: dict(tool_call.args),
+                )
         
         return tool_calls
     
-    def _execute_tool_call(self, tool_call: dict) -> str:
+    def _execute_tool_call(self, tool_call: ToolCall) -> str:
         """Execute a tool call and return the result.
         
         Args:
-            tool_call: Dictionary with 'name' and 'args' keys
+            tool_call: Parsed tool call
             
         Returns:
             Tool execution result as string
         """
-        name = tool_call.get("name", "").lower()
-        args = tool_call.get("args", {})
+        name = tool_call.name.lower()
+        args = tool_call.args
         
         if name == "terminal":
             command = args.get("command", "")
@@ -264,25 +473,94 @@ class Agent:
                 return "Error: command parameter required"
             
             result = self.terminal_tool.execute(command)
-            if result.success:
-                return f"Command executed successfully:\n{result.output}"
-            else:
-                return f"Command failed: {result.error}"
+            return self._format_terminal_result(result)
         
         elif name == "internet":
             url = args.get("url", "")
             if not url:
                 return "Error: url parameter required"
             
-            result = self.internet_tool.get(url)
-            if result.success:
-                return f"Response received:\n{result.output[:500]}"
-            else:
-                return f"Request failed: {result.error}"
+            result = self.internet_tool.get(url, max_bytes=500)
+            return self._format_internet_result(result)
         
         else:
             return f"Unknown tool: {name}"
+    
+    @staticmethod
+    def _format_terminal_result(result: ToolResult) -> str:
+        """Format a terminal tool result for the model."""
+        if result.success:
+            return f"Command executed successfully:\n{result.output}"
+        else:
+            return f"Command failed: {result.error}"
+    
+    @staticmethod
+    def _format_internet_result(result: ToolResult) -> str:
+        """Format an internet tool result for the model."""
+        if result.success:
+            return f"Response received:\n{result.output}"
+        else:
+            return f"Request failed: {result.error}"
+            
+    def _tool_executor(self) -> ThreadPoolExecutor:
+        """Get the agent's worker threads for overlapping tool calls."""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(thread_name_prefix="agent-tools")
+        return self._executor
+    
+    def close(self) -> None:
+        """Stop the tool worker threads and release the tools.
+        
+        The persistent shell is terminated and the internet tool lets go of
+        its session and cached responses instead of holding them until exit.
+        """
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        self.terminal_tool.stop_persistent()
+        self.internet_tool.close()
+    
+    def _execute_tool_calls(self, tool_calls: list[ToolCall]) -> list[str]:
+        """Execute all tool calls from one response.
+        
+        Every call goes through _execute_tool_call(), so a step with several
+        calls sees the same persistent shell and HTTP cache as a step with
+        one. Terminal commands run in order, as one may depend on what an
+        earlier one left in the shell (cd, export); HTTP calls are I/O-bound
+        and overlap with them and with each other.
+        
+        Args:
+            tool_calls: Parsed tool calls
             
+        Returns:
+            Tool execution results, in the same order as tool_calls
+        """
+        for tool_call in tool_calls:
+            logger.debug("Executing tool: {}", tool_call)
+        if len(tool_calls) == 1:
+            return [self._execute_tool_call(tool_calls[0])]
+        
+        def is_terminal(call: ToolCall) -> bool:
+            return call.name.lower() == "terminal"
+        
+        # One task runs the terminal commands in order; every other call gets its own
+        executor = self._tool_executor()
+        terminal = executor.submit(
+            lambda: [self._execute_tool_call(call) for call in tool_calls if is_terminal(call)]
+        )
+        others = [
+            executor.submit(self._execute_tool_call, call)
+            for call in tool_calls
+            if not is_terminal(call)
+        ]
+        
+        terminal_results = iter(terminal.result())
+        other_results = (future.result() for future in others)
+        return [
+            next(terminal_results) if is_terminal(call) else next(other_results)
+            for call in tool_calls
+        ]
+    
     def create_task_list(self, goal: str) -> list[Task]:
         """Create a task list for the given goal using guidance.
         
@@ -292,18 +570,21 @@ class Agent:
         Returns:
             List of tasks
         """
-        logger.info(f"Creating task list for goal: {goal}")
+        logger.info("Creating task list for goal: {}", goal)
         
         # Use guidance framework for prompt structuring, execute with llm_engine
         # Note: guidance.gen() has compatibility issues with llama.cpp KV cache,
-        # so we structure the prompt using guidance concepts but execute directly
+        # so we structure the prompt using guidance concepts but execute directly.
+        # The prompt starts with the system prompt, like reason_and_act(), so
+        # llama.cpp keeps the prefilled (or restored) system prompt in the KV
+        # cache for the first reasoning step instead of evicting it here.
         
-        self.llm_engine.model.reset()
-        
-        prompt = f"""Break down this goal into 3-5 tasks. Format each as 'Task N: description'
-
-Goal: {goal}
+        prompt = f"""{self._get_system_prompt()}
+<|im_start|>user
+Break down this goal into 3-5 tasks. Format each as 'Task N: description'
 
+Goal: {goal}<|im_end|>
+<|im_start|>assistant
 Tasks:
 Task 1:"""
         
@@ -325,7 +606,7 @@ Task 1:"""
                 tasks.append(Task(id=i, description=description))
         
         self.tasks = tasks
-        logger.info(f"Created {len(tasks)} tasks")
+        logger.info("Created {} tasks", len(tasks))
         return tasks
     
     def reason_and_act(self, current_task: Task) -> ReasoningStep:
@@ -337,30 +618,18 @@ Task 1:"""
         Returns:
             ReasoningStep with thought, action, and observation
         """
-        logger.info(f"Reasoning about task: {current_task.description}")
+        logger.info("Reasoning about task: {}", current_task.description)
         
-        self.llm_engine.model.reset()
+        # No model.reset() here: the KV cache still holds the system prompt
+        # (see _prefill_system_prompt) and llama.cpp re-evaluates only the
+        # tokens that follow the longest shared prefix.
         
         # Build prompt using LFM2.5 tool use format
         system_prompt = self._get_system_prompt()
         
-        user_message = f"""Task: {current_task.description}
-
-INSTRUCTIONS:
-1. If you need to run a command, use: <|tool_call_start|>[terminal(command="your command")]<|tool_call_end|>
-2. If you need to fetch a URL, use: <|tool_call_start|>[internet(url="https://example.com")]<|tool_call_end|>
-3. If a tool returns an error, READ IT and adapt your approach (e.g., Windows vs Linux commands)
-4. If task is complete, just explain the result.
-
-COMMON COMMANDS BY OPERATING SYSTEM:
-- List files: Windows = "dir", Linux/Mac = "ls"
-- Show file content: Windows = "type filename", Linux/Mac = "cat filename"
-- Current directory: Windows = "cd", Linux/Mac = "pwd"
-
-If you see error "not recognized as internal or external command", you are on Windows - use Windows commands!
-
-Always use the tool call format above. Do not write URLs or commands in plain text - wrap them in tool calls.
-Do not repeat commands that already failed - try different commands based on the error message."""
+        user_message = _USER_MESSAGE_TEMPLATE.format(
+            description=current_task.description
+        )
         
         # Build complete prompt with startoftext token - implements full tool use cycle
         # Note: llama.cpp may add <|startoftext|> automatically, so we omit it to avoid duplication
@@ -370,12 +639,20 @@ Do not repeat commands that already failed - try different commands based on the
 <|im_start|>assistant
 """
         
-        # Generate initial response
-        full_response = self.llm_engine.generate(
-            prompt=prompt,
-            max_tokens=300,
-            stop=["<|im_end|>"]
-        ).strip()
+        # Generate initial response; stop right after a completed tool call
+        # instead of decoding whatever the model writes after it
+        if self.settings.tool_call_mode == "guidance":
+            full_response = self._guided_tool_turn(prompt)
+        else:
+            full_response, stopped_on = self.llm_engine.generate_stream(
+                prompt=prompt,
+                max_tokens=300,
+                stop=["<|im_end|>", _TOOL_CALL_END],
+                grammar=TOOL_CALL_GRAMMAR if self.settings.tool_call_mode == "grammar" else None,
+            )
+            if stopped_on == _TOOL_CALL_END:
+                full_response += _TOOL_CALL_END
+        full_response = full_response.strip()
         
         # Parse tool calls if present
         tool_calls = self._parse_tool_calls(full_response)
@@ -386,41 +663,45 @@ Do not repeat commands that already failed - try different commands based on the
         
         # Execute tool calls and implement full cycle: generate → execute → return result → regenerate
         if tool_calls:
-            # Collect results from all tool executions
-            tool_responses = []
-            for tool_call in tool_calls:
-                logger.debug(f"Executing tool: {tool_call}")
-                result = self._execute_tool_call(tool_call)
-                tool_responses.append(result)
-                observation += f"\n{tool_call['name']}: {result}"
-                action = tool_call.get("name", "complete")
+            # Collect results from all tool executions (run concurrently)
+            tool_responses = self._execute_tool_calls(tool_calls)
+            for tool_call, result in zip(tool_calls, tool_responses):
+                observation += f"\n{tool_call.name}: {result}"
+                action = tool_call.name
             
             # Build conversation with tool responses and regenerate
-            conversation = f"""{system_prompt}
-<|im_start|>user
-{user_message}<|im_end|>
-<|im_start|>assistant
-{full_response}<|im_end|>
-"""
+            parts = [
+                system_prompt,
+                "\n<|im_start|>user\n", user_message, "<|im_end|>\n",
+                "<|im_start|>assistant\n", full_response, "<|im_end|>\n",
+            ]
             
-            # Add tool responses
-            for result in tool_responses:
-                conversation += f"""<|im_start|>tool
-{result}<|im_end|>
-"""
+            # Add tool responses, truncated to bound prompt size
+            parts.extend(
+                f"<|im_start|>tool\n{result[:_MAX_TOOL_RESPONSE_CHARS]}<|im_end|>\n"
+                for result in tool_responses
+            )
             
             # Add assistant marker for regeneration
-            conversation += "<|im_start|>assistant\n"
+            parts.append("<|im_start|>assistant\n")
+            conversation = "".join(parts)
             
-            # Reset model KV cache before regeneration
-            self.llm_engine.model.reset()
+            # The conversation extends the previous prompt, so the cached
+            # prefix is reused and only the new turns are prefilled
             
-            # Regenerate to let model interpret results
-            final_response = self.llm_engine.generate(
-                prompt=conversation,
-                max_tokens=200,
-                stop=["<|im_end|>"]
-            ).strip()
+            # Regenerate to let model interpret results, unless this exact
+            # conversation (same task, response and tool outputs) was seen before
+            cache_key = hashlib.sha256(conversation.encode("utf-8")).hexdigest()
+            final_response = self._response_cache.get(cache_key)
+            if final_response is None:
+                final_response = self.llm_engine.generate(
+                    prompt=conversation,
+                    max_tokens=200,
+                    stop=["<|im_end|>"]
+                ).strip()
+                self._response_cache[cache_key] = final_response
+            else:
+                logger.debug("Reusing cached response for identical tool results")
             
             thought = final_response
         else:
@@ -480,31 +761,32 @@ Do not repeat commands that already failed - try different commands based on the
         
         if action_lower.startswith("internet:"):
             url = action_text.split(":", 1)[1].strip()
-            result = self.internet_tool.get(url)
+            result = self.internet_tool.get(url, max_bytes=300)
             if result.success:
-                return f"Response (truncated): {result.output[:300]}"
+                return f"Response (truncated): {result.output}"
             else:
                 return f"Request failed: {result.error}"
         
         return f"Unknown action: {action_text}"
     
-    def run(self, goal: str) -> dict[str, Any]:
+    def run(self, goal: str, results_path: Optional[Path] = None) -> dict[str, Any]:
         """Run the agent to achieve the goal.
         
         Args:
             goal: The goal to achieve
+            results_path: Optional JSON file to write the results to
             
         Returns:
             Results dictionary with tasks, steps, and outcome
         """
-        logger.info(f"Starting agent run for goal: {goal}")
+        logger.info("Starting agent run for goal: {}", goal)
         
         # Create task list
         tasks = self.create_task_list(goal)
         
         # Process each task
         for task in tasks:
-            logger.info(f"Working on task {task.id}: {task.description}")
+            logger.info("Working on task {}: {}", task.id, task.description)
             task.status = "in-progress"
             
             # Reasoning loop for this task
@@ -533,7 +815,7 @@ Do not repeat commands that already failed - try different commands based on the
                     observation = "Task marked as complete"
                     step.observation = observation
                     task.status = "completed"
-                    logger.info(f"Task {task.id} completed")
+                    logger.info("Task {} completed", task.id)
                     break
                 
                 # Update reasoning steps with observation
@@ -541,20 +823,24 @@ Do not repeat commands that already failed - try different commands based on the
                 
                 # Check if task should continue
                 if step.observation and "failed" in step.observation.lower():
-                    logger.debug(f"Task {task.id}: {step.observation}")
+                    logger.debug("Task {}: {}", task.id, step.observation)
             
             if task.status != "completed":
                 task.status = "failed"
-                logger.warning(f"Task {task.id} did not complete")
+                logger.warning("Task {} did not complete", task.id)
         
         # Compile results
         results = {
             "goal": goal,
-            "tasks": [t.model_dump() for t in tasks],
-            "reasoning_steps": [s.model_dump() for s in self.reasoning_steps],
+            "tasks": [asdict(t) for t in tasks],
+            "reasoning_steps": [asdict(s) for s in self.reasoning_steps],
             "iterations": self.iteration_count,
             "success": all(t.status == "completed" for t in tasks),
         }
         
-        logger.info(f"Agent run completed: {results['success']}")
+        if results_path is not None:
+            results_path.write_bytes(orjson.dumps(results, option=orjson.OPT_INDENT_2))
+            logger.info("Results written to {}", results_path)
+        
+        logger.info("Agent run completed: {}", results['success'])
         return results
@@ -1,8 +1,9 @@
 """Configuration management for Agent 86."""
 
 import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import Literal, Optional
 
 from pydantic import Field
 from pydantic_settings import BaseSettings
@@ -17,14 +18,35 @@ class Settings(BaseSettings):
         description="Path to the GGUF model file"
     )
     model_n_ctx: int = Field(default=4096, description="Context window size")
-    model_n_gpu_layers: int = Field(default=0, description="Number of GPU layers")
+    model_n_batch: int = Field(default=512, description="Prompt tokens evaluated per decode batch")
+    model_n_gpu_layers: int = Field(
+        default=-1, description="Number of GPU layers (-1 = all, 0 = CPU only)"
+    )
+    model_n_threads: Optional[int] = Field(
+        default=None, description="Generation threads (None = half the CPU cores)"
+    )
+    model_n_threads_batch: Optional[int] = Field(
+        default=None, description="Prompt processing threads (None = all CPU cores)"
+    )
     model_temperature: float = Field(default=0.7, description="Sampling temperature")
+    model_kv_cache_type: Literal["f32", "f16", "q8_0", "q4_0"] = Field(
+        default="q8_0", description="KV cache data type (quantized types need flash attention)"
+    )
+    model_flash_attn: bool = Field(default=True, description="Use fused flash attention kernels")
+    model_kv_state_path: Optional[Path] = Field(
+        default=Path.home() / ".cache" / "agent86" / "kv_sysprompt.bin",
+        description="File caching the prefilled system prompt KV state (None to disable)"
+    )
     
     # Agent configuration
     max_iterations: int = Field(default=10, description="Maximum agent iterations")
     max_reasoning_steps: int = Field(default=5, description="Maximum reasoning steps")
     enable_terminal: bool = Field(default=True, description="Enable terminal tool")
     enable_internet: bool = Field(default=True, description="Enable internet tool")
+    tool_call_mode: Literal["free", "grammar", "guidance"] = Field(
+        default="free",
+        description="How tool turns are generated: free text, GBNF grammar or guidance program"
+    )
     
     # Logging
     log_level: str = Field(default="INFO", description="Logging level")
@@ -36,6 +58,11 @@ class Settings(BaseSettings):
         extra = "ignore"
 
 
+@lru_cache(maxsize=1)
 def get_settings() -> Settings:
-    """Get application settings."""
+    """Get application settings.
+    
+    Settings are read from the environment once per process; call
+    get_settings.cache_clear() to pick up environment changes.
+    """
     return Settings()
@@ -2,13 +2,30 @@
 
 from pathlib import Path
 from typing import Optional
+import hashlib
 
-from llama_cpp import Llama
+import llama_cpp
+import numpy as np
+import orjson
+from llama_cpp import Llama, LlamaGrammar
+from llama_cpp.llama import LlamaState
 from loguru import logger
 
 from .config import Settings
 
 
+# Settings.model_kv_cache_type -> ggml type used for the K and V caches
+KV_CACHE_TYPES = {
+    "f32": llama_cpp.GGML_TYPE_F32,
+    "f16": llama_cpp.GGML_TYPE_F16,
+    "q8_0": llama_cpp.GGML_TYPE_Q8_0,
+    "q4_0": llama_cpp.GGML_TYPE_Q4_0,
+}
+
+# LFM2.5 markers that end a generation turn
+STOP_MARKERS = ("<|im_end|>", "<|tool_call_end|>")
+
+
 class LLMEngine:
     """Wrapper for llama.cpp model."""
     
@@ -20,6 +37,8 @@ class LLMEngine:
         """
         self.settings = settings
         self._model: Optional[Llama] = None
+        self._grammars: dict[str, LlamaGrammar] = {}
+        self._stop_tokens: dict[str, list[int]] = {}
         
     def load_model(self) -> None:
         """Load the GGUF model."""
@@ -28,15 +47,27 @@ class LLMEngine:
                 f"Model file not found: {self.settings.model_path}"
             )
         
-        logger.info(f"Loading model from {self.settings.model_path}")
+        logger.info("Loading model from {}", self.settings.model_path)
         
+        kv_cache_type = KV_CACHE_TYPES[self.settings.model_kv_cache_type]
         self._model = Llama(
             model_path=str(self.settings.model_path),
             n_ctx=self.settings.model_n_ctx,
+            n_batch=self.settings.model_n_batch,
             n_gpu_layers=self.settings.model_n_gpu_layers,
+            n_threads=self.settings.model_n_threads,
+            n_threads_batch=self.settings.model_n_threads_batch,
+            type_k=kv_cache_type,
+            type_v=kv_cache_type,
+            flash_attn=self.settings.model_flash_attn,
             verbose=False,
         )
         
+        # Pre-tokenize the chat/tool markers used as stop sequences
+        self._stop_tokens.clear()
+        for marker in STOP_MARKERS:
+            self._stop_token_ids(marker)
+        
         logger.info("Model loaded successfully")
     
     @property
@@ -59,14 +90,19 @@ class LLMEngine:
         max_tokens: int = 512,
         temperature: Optional[float] = None,
         stop: Optional[list[str]] = None,
+        grammar: Optional[str] = None,
     ) -> str:
         """Generate text from prompt.
         
+        The KV cache is kept between calls: llama.cpp only evaluates the
+        prompt tokens after the longest prefix shared with the cached state.
+        
         Args:
             prompt: Input prompt
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (uses config default if None)
             stop: Stop sequences
+            grammar: GBNF grammar constraining the output
             
         Returns:
             Generated text
@@ -79,6 +115,203 @@ class LLMEngine:
             temperature=temp,
             stop=stop or [],
             echo=False,
+            grammar=self._get_grammar(grammar) if grammar else None,
         )
         
         return result["choices"][0]["text"]
+    
+    def prefill(self, prompt: str) -> list[int]:
+        """Evaluate a prompt into the KV cache without generating.
+        
+        When the cached tokens are a prefix of the prompt only the new
+        suffix is evaluated; otherwise the cache is rebuilt from scratch.
+        Later generate() calls that start with this prompt reuse it.
+        
+        Args:
+            prompt: Prompt to evaluate
+            
+        Returns:
+            Token ids of the prompt
+        """
+        tokens = self.model.tokenize(prompt.encode("utf-8"), special=True)
+        cached = list(self.model.eval_tokens)
+        
+        if cached and tokens[: len(cached)] == cached:
+            self.model.eval(tokens[len(cached):])
+        else:
+            self.model.reset()
+            self.model.eval(tokens)
+        
+        return tokens
+    
+    def _state_key(self, prompt: str) -> str:
+        """Hash identifying the KV state produced by prefilling prompt."""
+        model_stat = self.settings.model_path.stat()
+        parts = (
+            str(self.settings.model_path.resolve()),
+            str(model_stat.st_size),
+            str(model_stat.st_mtime_ns),
+            str(self.settings.model_n_ctx),
+            self.settings.model_kv_cache_type,
+            prompt,
+        )
+        return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+    
+    def save_state(self, path: Path, prompt: str) -> None:
+        """Write the current KV cache, produced by prefilling prompt, to disk.
+        
+        The file is a one-line JSON header (key, tokens, seed) followed by
+        the raw llama.cpp state. Logits are not stored; without logits_all
+        they are never read back.
+        
+        Args:
+            path: State file to write
+            prompt: Prompt the cache was prefilled with
+        """
+        try:
+            state = self.model.save_state()
+        except RuntimeError as e:
+            logger.warning("Could not save KV state: {}", e)
+            return
+        
+        header = orjson.dumps({
+            "key": self._state_key(prompt),
+            "input_ids": state.input_ids[: state.n_tokens].tolist(),
+            "seed": state.seed,
+        })
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(header + b"\n" + state.llama_state)
+        tmp_path.replace(path)
+        logger.debug("Saved {} tokens of KV state to {}", state.n_tokens, path)
+    
+    def load_state(self, path: Path, prompt: str) -> bool:
+        """Restore a KV cache written by save_state() for the same prompt.
+        
+        Args:
+            path: State file to read
+            prompt: Prompt the cache must have been prefilled with
+            
+        Returns:
+            True if the state was restored, False if it is missing or stale
+        """
+        if not path.exists():
+            return False
+        
+        data = path.read_bytes()
+        header_end = data.find(b"\n")
+        try:
+            header = orjson.loads(data[:header_end])
+        except orjson.JSONDecodeError:
+            logger.warning("Ignoring unreadable KV state file {}", path)
+            return False
+        if header.get("key") != self._state_key(prompt):
+            return False
+        
+        model = self.model
+        n_tokens = len(header["input_ids"])
+        input_ids = np.zeros(model.n_ctx(), dtype=np.intc)
+        input_ids[:n_tokens] = header["input_ids"]
+        llama_state = data[header_end + 1:]
+        try:
+            model.load_state(LlamaState(
+                input_ids=input_ids,
+                scores=np.zeros((1, model.n_vocab()), dtype=np.single),
+                n_tokens=n_tokens,
+                llama_state=llama_state,
+                llama_state_size=len(llama_state),
+                seed=header["seed"],
+            ))
+        except RuntimeError as e:
+            logger.warning("Could not load KV state from {}: {}", path, e)
+            model.reset()
+            return False
+        
+        logger.debug("Restored {} tokens of KV state from {}", n_tokens, path)
+        return True
+    
+    def generate_stream(
+        self,
+        prompt: str,
+        max_tokens: int = 512,
+        temperature: Optional[float] = None,
+        stop: Optional[list[str]] = None,
+        grammar: Optional[str] = None,
+    ) -> tuple[str, Optional[str]]:
+        """Generate text from prompt, stopping as soon as a stop sequence appears.
+        
+        Unlike generate(), this reports which stop sequence ended generation,
+        so callers can act on e.g. a completed tool call right away. Stop
+        sequences are matched on token ids, so the running output is only
+        detokenized once at the end.
+        
+        Args:
+            prompt: Input prompt
+            max_tokens: Maximum tokens to generate
+            temperature: Sampling temperature (uses config default if None)
+            stop: Stop sequences
+            grammar: GBNF grammar constraining the output
+            
+        Returns:
+            Tuple of generated text (without the stop sequence) and the stop
+            sequence that ended generation, or None if none was hit
+        """
+        temp = temperature if temperature is not None else self.settings.model_temperature
+        stop_sequences = [(s, self._stop_token_ids(s)) for s in stop or []]
+        eos_token = self.model.token_eos()
+        
+        prompt_tokens = self.model.tokenize(prompt.encode("utf-8"), special=True)
+        generated: list[int] = []
+        stopped_on: Optional[str] = None
+        
+        tokens = self.model.generate(
+            prompt_tokens,
+            temp=temp,
+            grammar=self._get_grammar(grammar) if grammar else None,
+        )
+        for token in tokens:
+            if token == eos_token:
+                break
+            generated.append(token)
+            
+            for stop_sequence, stop_ids in stop_sequences:
+                if stop_ids and generated[-len(stop_ids):] == stop_ids:
+                    del generated[-len(stop_ids):]
+                    stopped_on = stop_sequence
+                    break
+            
+            if stopped_on is not None or len(generated) >= max_tokens:
+                break
+        
+        text = self.model.detokenize(generated, prev_tokens=prompt_tokens)
+        return text.decode("utf-8", errors="ignore"), stopped_on
+    
+    def _stop_token_ids(self, stop: str) -> list[int]:
+        """Get the token ids of a stop sequence, tokenizing it only once.
+        
+        Args:
+            stop: Stop sequence
+            
+        Returns:
+            Token ids of the stop sequence
+        """
+        token_ids = self._stop_tokens.get(stop)
+        if token_ids is None:
+            token_ids = self.model.tokenize(stop.encode("utf-8"), add_bos=False, special=True)
+            self._stop_tokens[stop] = token_ids
+        return token_ids
+    
+    def _get_grammar(self, grammar: str) -> LlamaGrammar:
+        """Compile a GBNF grammar, reusing earlier compilations.
+        
+        Args:
+            grammar: GBNF grammar source
+            
+        Returns:
+            Compiled grammar
+        """
+        compiled = self._grammars.get(grammar)
+        if compiled is None:
+            compiled = LlamaGrammar.from_string(grammar, verbose=False)
+            self._grammars[grammar] = compiled
+        return compiled
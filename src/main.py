@@ -129,6 +129,8 @@ def main() -> None:
         console.print(f"[bold red]Error during execution:[/bold red] {e}")
         logger.exception("Agent execution failed")
         sys.exit(1)
+    finally:
+        agent.close()
 
 
 if __name__ == "__main__":
@@ -1,14 +1,164 @@
 """Agent tools for terminal and internet access."""
 
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, NamedTuple, Optional
+import asyncio
+import atexit
+import os
+import re
+import select
+import shlex
+import shutil
+import signal
 import subprocess
-from typing import Any, Optional
+import tempfile
+import threading
+import time
+import uuid
 
-import requests
+import orjson
 from loguru import logger
-from pydantic import BaseModel
 
+# requests and httpx are imported where first used: constructing the tools
+# (e.g. with the internet tool disabled) should not pay for their import
+if TYPE_CHECKING:
+    import httpx
+    import requests
 
-class ToolResult(BaseModel):
+
+# Characters that only a shell interprets
+_SHELL_METACHARS = frozenset("|&;<>()$`\\*?[]{}~#\n")
+
+# Commands that exist only as shell builtins or keywords
+_SHELL_BUILTINS = frozenset({
+    ".", "alias", "bg", "builtin", "cd", "command", "declare", "dirs",
+    "disown", "eval", "exec", "exit", "export", "fg", "hash", "help",
+    "history", "jobs", "let", "local", "popd", "pushd", "read", "readonly",
+    "set", "shopt", "source", "time", "times", "trap", "type", "typeset",
+    "ulimit", "umask", "unalias", "unset", "wait",
+})
+
+
+def _split_command(command: str) -> Optional[list[str]]:
+    """Split a command into argv when it can run without a shell.
+    
+    Args:
+        command: Command line
+        
+    Returns:
+        The argv, or None on Windows and for commands that need shell syntax,
+        variable assignments, builtins or anything not found on PATH (the
+        shell may still know it, and otherwise reports it as not found)
+    """
+    if os.name == "nt" or any(c in _SHELL_METACHARS for c in command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] in _SHELL_BUILTINS or "=" in argv[0]:
+        return None
+    if shutil.which(argv[0]) is None:
+        return None
+    return argv
+
+
+def _fits_shell_framing(command: str) -> bool:
+    """Whether a command can run in the persistent shell.
+    
+    With unbalanced quotes or a trailing backslash, bash would read the
+    framing lines after the command as part of it and wait until the
+    timeout instead of failing right away.
+    
+    Args:
+        command: Command line
+        
+    Returns:
+        True if the command's quoting is balanced
+    """
+    try:
+        shlex.split(command, comments=True)
+    except ValueError:
+        return False
+    return True
+
+
+# Most bytes kept from a command's stdout (and, separately, its stderr); a
+# command that writes more is killed so a runaway `yes` or `cat` of a huge
+# file cannot fill memory
+MAX_OUTPUT_BYTES = 64 * 1024
+_OUTPUT_EXCEEDED = f"Command output exceeded {MAX_OUTPUT_BYTES} bytes and was stopped"
+
+# Number of command results a cacheable TerminalTool keeps
+RESULT_CACHE_SIZE = 256
+
+
+def _decode_output(data: bytes) -> str:
+    """Decode captured command output like text-mode pipes would."""
+    return data.decode("utf-8", errors="replace").replace("\r\n", "\n").strip()
+
+
+def _kill_process_tree(process: Any) -> None:
+    """Kill a command and anything it started.
+    
+    On POSIX the command runs in its own session, so killing the process
+    group also stops the children of sh -c that keep the pipes open.
+    
+    Args:
+        process: subprocess.Popen or asyncio.subprocess.Process
+    """
+    if os.name == "nt":
+        process.kill()
+        return
+    try:
+        os.killpg(process.pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+
+
+def _read_limited(pipe: Any, buffer: bytearray, overflowed: threading.Event, process: Any) -> None:
+    """Read a pipe to EOF into buffer, killing the process past MAX_OUTPUT_BYTES.
+    
+    Args:
+        pipe: Binary pipe of the process
+        buffer: Receives at most MAX_OUTPUT_BYTES bytes
+        overflowed: Set when the process wrote more than that
+        process: Process writing to the pipe
+    """
+    with pipe:
+        while chunk := pipe.read1(65536):
+            room = MAX_OUTPUT_BYTES - len(buffer)
+            buffer += chunk[:room]
+            if len(chunk) > room:
+                overflowed.set()
+                _kill_process_tree(process)
+                return
+
+
+async def _aread_limited(stream: "asyncio.StreamReader", buffer: bytearray, process: Any) -> bool:
+    """Async counterpart of _read_limited.
+    
+    Args:
+        stream: Output stream of the process
+        buffer: Receives at most MAX_OUTPUT_BYTES bytes
+        process: Process writing to the stream
+    
+    Returns:
+        True if the process wrote more than MAX_OUTPUT_BYTES and was killed
+    """
+    while chunk := await stream.read(65536):
+        room = MAX_OUTPUT_BYTES - len(buffer)
+        buffer += chunk[:room]
+        if len(chunk) > room:
+            _kill_process_tree(process)
+            return True
+    return False
+
+
+@dataclass(slots=True, frozen=True)
+class ToolResult:
     """Result from a tool execution."""
     
     success: bool
@@ -16,20 +166,202 @@ class ToolResult(BaseModel):
     error: Optional[str] = None
 
 
+# Returned by every call to a disabled tool; ToolResult is frozen, so one
+# instance can be shared
+_TERMINAL_DISABLED = ToolResult(success=False, output="", error="Terminal tool is disabled")
+_INTERNET_DISABLED = ToolResult(success=False, output="", error="Internet tool is disabled")
+
+
 class TerminalTool:
     """Execute terminal commands."""
     
-    def __init__(self, enabled: bool = True):
+    def __init__(self, enabled: bool = True, persistent: bool = False, cacheable: bool = False):
         """Initialize terminal tool.
         
         Args:
             enabled: Whether the tool is enabled
+            persistent: Run commands in one long-lived shell, started on first use
+            cacheable: Reuse successful results of repeated commands; only for
+                tools that run read-only, deterministic commands
         """
         self.enabled = enabled
+        self.persistent = persistent
+        self.cacheable = cacheable
+        self._result_cache: OrderedDict[tuple, ToolResult] = OrderedDict()
+        self._shell: Optional[subprocess.Popen] = None
+        self._shell_lock = threading.Lock()
+        self._stderr_path: Optional[Path] = None
+        self._atexit_registered = False
+        self._cwd: Optional[str] = None  # persistent shell's working directory
+    
+    def start_persistent(self) -> None:
+        """Start a long-lived bash process that runs subsequent commands.
+        
+        Commands then share one shell instead of forking a new one per call,
+        so working directory and environment changes carry over between
+        them. Not available on Windows or without bash; execute() then keeps
+        spawning a shell per command.
+        """
+        if not self.enabled or self._shell is not None:
+            return
+        
+        bash = shutil.which("bash")
+        if os.name == "nt" or bash is None:
+            logger.debug("Persistent shell unavailable, using one shell per command")
+            self.persistent = False
+            return
+        
+        stderr_fd, stderr_path = tempfile.mkstemp(prefix="agent86-stderr-")
+        os.close(stderr_fd)
+        self._stderr_path = Path(stderr_path)
+        self._shell = subprocess.Popen(
+            [bash, "--noprofile", "--norc"],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            bufsize=0,
+            cwd=self._cwd,
+        )
+        
+        self.persistent = True
+        if not self._atexit_registered:
+            atexit.register(self.stop_persistent)
+            self._atexit_registered = True
+        logger.debug("Started persistent shell (pid {})", self._shell.pid)
+    
+    def stop_persistent(self) -> None:
+        """Terminate the persistent shell, if running."""
+        if self._shell is None:
+            return
+        
+        shell, self._shell = self._shell, None
+        shell.kill()
+        shell.wait()
+        shell.stdin.close()
+        shell.stdout.close()
+        if self._stderr_path is not None:
+            self._stderr_path.unlink(missing_ok=True)
+            self._stderr_path = None
+    
+    def _restart_persistent(self) -> None:
+        """Replace a timed out or exited persistent shell with a fresh one."""
+        self.stop_persistent()
+        self.start_persistent()
+    
+    def _execute_persistent(self, command: str, timeout: int) -> ToolResult:
+        """Run a command in the persistent shell.
+        
+        The command is followed by a printf of a unique sentinel, its exit
+        status and $PWD; stdout is read up to that line. stdin is /dev/null so the
+        command cannot consume the script, and stderr goes to a file that
+        is read back once the command finishes. A command that prints more
+        than MAX_OUTPUT_BYTES is stopped by restarting the shell.
+        
+        Args:
+            command: Command to execute
+            timeout: Timeout in seconds
+            
+        Returns:
+            ToolResult with command output
+        """
+        marker = f"\n__AGENT86_DONE_{uuid.uuid4().hex}__ ".encode()
+        script = (
+            f"{{ {command}\n}} </dev/null 2>{shlex.quote(str(self._stderr_path))}\n"
+            f"printf '{marker.decode()}%d %s\\n' $? \"$PWD\"\n"
+        )
+        
+        try:
+            self._shell.stdin.write(script.encode("utf-8"))
+        except BrokenPipeError:
+            self._restart_persistent()
+            return ToolResult(success=False, output="", error="Persistent shell exited")
+        
+        fd = self._shell.stdout.fileno()
+        buffer = bytearray()
+        deadline = time.monotonic() + timeout
+        search_from = 0
+        
+        while True:
+            end = buffer.find(marker, search_from)
+            if end != -1:
+                status_end = buffer.find(b"\n", end + len(marker))
+                if status_end != -1:
+                    break
+            else:
+                search_from = max(0, len(buffer) - len(marker))
+                if search_from > MAX_OUTPUT_BYTES:
+                    self._restart_persistent()
+                    return ToolResult(
+                        success=False,
+                        output=_decode_output(buffer[:MAX_OUTPUT_BYTES]),
+                        error=_OUTPUT_EXCEEDED
+                    )
+            
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                self._restart_persistent()
+                return ToolResult(
+                    success=False,
+                    output=_decode_output(buffer[:MAX_OUTPUT_BYTES]),
+                    error=f"Command timed out after {timeout} seconds"
+                )
+            
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                self._restart_persistent()
+                return ToolResult(
+                    success=False,
+                    output=buffer.decode("utf-8", errors="replace").strip(),
+                    error="Persistent shell exited"
+                )
+            buffer += chunk
+        
+        status, _, cwd = buffer[end + len(marker):status_end].decode(
+            "utf-8", errors="replace"
+        ).partition(" ")
+        returncode = int(status)
+        self._cwd = cwd
+        output = _decode_output(buffer[:min(end, MAX_OUTPUT_BYTES)])
+        if end > MAX_OUTPUT_BYTES:
+            return ToolResult(success=False, output=output, error=_OUTPUT_EXCEEDED)
+        
+        success = returncode == 0
+        error = None
+        if not success:
+            with self._stderr_path.open("rb") as stderr:
+                error = _decode_output(stderr.read(MAX_OUTPUT_BYTES))
+        
+        # Lazy, so the output isn't sliced when DEBUG is filtered out
+        logger.opt(lazy=True).debug(
+            "Command result: success={}, output={}", lambda: success, lambda: output[:100]
+        )
+        
+        return ToolResult(
+            success=success,
+            output=output,
+            error=error
+        )
     
     def execute(self, command: str, timeout: int = 30) -> ToolResult:
         """Execute a terminal command.
         
+        Uses the persistent shell, starting it if needed, when it is enabled
+        and idle. Otherwise (or while another call holds it, or when the
+        command's quoting would break the framing) the command runs in a
+        new process, started in the persistent shell's working directory.
+        That process is the command itself when it uses no shell syntax,
+        builtins or variable assignments (no sh -c in between); anything
+        else still goes through the shell. A missing executable is then
+        reported by the OS ("No such file or directory") rather than by sh.
+        
+        Output is read as it arrives and kept up to MAX_OUTPUT_BYTES per
+        stream; a command that writes more is killed, and one that times
+        out, like it, returns what it printed so far.
+        
+        With cacheable set, a command that succeeded before (with the same
+        timeout and working directory) returns its earlier result without
+        running again.
+        
         Args:
             command: Command to execute
             timeout: Timeout in seconds
@@ -38,86 +370,595 @@ class TerminalTool:
             ToolResult with command output
         """
         if not self.enabled:
+            return _TERMINAL_DISABLED
+        if not self.cacheable:
+            return self._execute(command, timeout)
+        
+        key = (command, timeout, self._cwd)
+        result = self._cached_result(key)
+        if result is None:
+            result = self._execute(command, timeout)
+            self._cache_result(key, result)
+        return result
+    
+    def _cached_result(self, key: tuple) -> Optional[ToolResult]:
+        """Get the cached result for a command, or None."""
+        result = self._result_cache.get(key)
+        if result is not None:
+            self._result_cache.move_to_end(key)
+        return result
+    
+    def _cache_result(self, key: tuple, result: ToolResult) -> None:
+        """Keep a successful result; failures (timeouts included) run again."""
+        if not result.success:
+            return
+        self._result_cache[key] = result
+        self._result_cache.move_to_end(key)
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
+    
+    def _execute(self, command: str, timeout: int) -> ToolResult:
+        """Run a command (see execute())."""
+        logger.info("Executing command: {}", command)
+        
+        if (
+            self.persistent
+            and _fits_shell_framing(command)
+            and self._shell_lock.acquire(blocking=False)
+        ):
+            try:
+                self.start_persistent()
+                if self._shell is not None:
+                    return self._execute_persistent(command, timeout)
+            finally:
+                self._shell_lock.release()
+        
+        argv = _split_command(command)
+        try:
+            process = subprocess.Popen(
+                argv if argv is not None else command,
+                shell=argv is None,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                cwd=self._cwd,
+                start_new_session=os.name != "nt",
+            )
+        except Exception as e:
             return ToolResult(
                 success=False,
                 output="",
-                error="Terminal tool is disabled"
+                error=str(e)
             )
         
-        logger.info(f"Executing command: {command}")
+        # One reader thread per pipe (select() cannot wait on pipes on Windows)
+        stdout, stderr = bytearray(), bytearray()
+        overflowed = threading.Event()
+        readers = [
+            threading.Thread(target=_read_limited, args=(pipe, buffer, overflowed, process), daemon=True)
+            for pipe, buffer in ((process.stdout, stdout), (process.stderr, stderr))
+        ]
+        for reader in readers:
+            reader.start()
         
-        try:
-            result = subprocess.run(
-                command,
-                shell=True,
-                capture_output=True,
-                text=True,
-                timeout=timeout,
+        # The readers finish once every process holding the pipes has exited
+        deadline = time.monotonic() + timeout
+        for reader in readers:
+            reader.join(max(0.0, deadline - time.monotonic()))
+        timed_out = any(reader.is_alive() for reader in readers)
+        if not timed_out:
+            try:
+                process.wait(max(0.0, deadline - time.monotonic()))
+            except subprocess.TimeoutExpired:
+                timed_out = True
+        if timed_out:
+            _kill_process_tree(process)
+            process.wait()
+            for reader in readers:
+                reader.join(1.0)
+            return ToolResult(
+                success=False,
+                output=_decode_output(stdout),
+                error=f"Command timed out after {timeout} seconds"
             )
-            
-            success = result.returncode == 0
-            output = result.stdout.strip()
-            error = result.stderr.strip() if not success else None
-            
-            logger.debug(f"Command result: success={success}, output={output[:100]}")
-            
+        
+        output = _decode_output(stdout)
+        if overflowed.is_set():
             return ToolResult(
-                success=success,
+                success=False,
                 output=output,
-                error=error
+                error=_OUTPUT_EXCEEDED
             )
+        
+        success = process.returncode == 0
+        error = _decode_output(stderr) if not success else None
+        
+        # Lazy, so the output isn't sliced when DEBUG is filtered out
+        logger.opt(lazy=True).debug(
+            "Command result: success={}, output={}", lambda: success, lambda: output[:100]
+        )
+        
+        return ToolResult(
+            success=success,
+            output=output,
+            error=error
+        )
+    
+    async def aexecute(self, command: str, timeout: int = 30) -> ToolResult:
+        """Execute a terminal command without blocking the event loop.
+        
+        Commands without shell syntax are started directly from their argv,
+        skipping the sh -c process; the rest go through the shell. Like the
+        execute() fallback they run in the persistent shell's working
+        directory, with output capped at MAX_OUTPUT_BYTES per stream.
+        Results are cached as in execute() when cacheable is set.
+        
+        Args:
+            command: Command to execute
+            timeout: Timeout in seconds
             
-        except subprocess.TimeoutExpired:
+        Returns:
+            ToolResult with command output
+        """
+        if not self.enabled:
+            return _TERMINAL_DISABLED
+        if not self.cacheable:
+            return await self._aexecute(command, timeout)
+        
+        key = (command, timeout, self._cwd)
+        result = self._cached_result(key)
+        if result is None:
+            result = await self._aexecute(command, timeout)
+            self._cache_result(key, result)
+        return result
+    
+    async def _aexecute(self, command: str, timeout: int) -> ToolResult:
+        """Run a command as an asyncio subprocess (see aexecute())."""
+        logger.info("Executing command: {}", command)
+        
+        argv = _split_command(command)
+        try:
+            if argv is not None:
+                process = await asyncio.create_subprocess_exec(
+                    *argv,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self._cwd,
+                    start_new_session=os.name != "nt",
+                )
+            else:
+                process = await asyncio.create_subprocess_shell(
+                    command,
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.PIPE,
+                    cwd=self._cwd,
+                    start_new_session=os.name != "nt",
+                )
+        except OSError as e:
             return ToolResult(
                 success=False,
                 output="",
+                error=str(e)
+            )
+        
+        stdout, stderr = bytearray(), bytearray()
+        try:
+            overflowed = await asyncio.wait_for(
+                asyncio.gather(
+                    _aread_limited(process.stdout, stdout, process),
+                    _aread_limited(process.stderr, stderr, process),
+                ),
+                timeout,
+            )
+            await process.wait()
+        except asyncio.TimeoutError:
+            _kill_process_tree(process)
+            await process.wait()
+            return ToolResult(
+                success=False,
+                output=_decode_output(stdout),
                 error=f"Command timed out after {timeout} seconds"
             )
-        except Exception as e:
+        
+        output = _decode_output(stdout)
+        if any(overflowed):
             return ToolResult(
                 success=False,
-                output="",
-                error=str(e)
+                output=output,
+                error=_OUTPUT_EXCEEDED
             )
+        
+        success = process.returncode == 0
+        error = _decode_output(stderr) if not success else None
+        
+        # Lazy, so the output isn't sliced when DEBUG is filtered out
+        logger.opt(lazy=True).debug(
+            "Command result: success={}, output={}", lambda: success, lambda: output[:100]
+        )
+        
+        return ToolResult(
+            success=success,
+            output=output,
+            error=error
+        )
+
+
+def _json_body(data: Optional[dict], body_arg: str = "data") -> dict[str, Any]:
+    """Request arguments sending data as a JSON body encoded with orjson.
+    
+    Args:
+        data: Data to send (no body if None)
+        body_arg: Name of the raw body argument ("data" for requests,
+            "content" for httpx)
+        
+    Returns:
+        Keyword arguments for the request call
+    """
+    if data is None:
+        return {}
+    return {
+        body_arg: orjson.dumps(data),
+        "headers": {"Content-Type": "application/json"},
+    }
+
+
+def _read_body(response: "requests.Response", max_bytes: int) -> tuple[bytes, bool]:
+    """Read at most max_bytes of a streamed response body.
+    
+    Args:
+        response: Response opened with stream=True
+        max_bytes: Maximum number of body bytes to read
+        
+    Returns:
+        The bytes read and whether they are the whole body
+    """
+    body = bytearray()
+    for chunk in response.iter_content(chunk_size=max_bytes):
+        body += chunk
+        if len(body) >= max_bytes:
+            return bytes(body[:max_bytes]), False
+    return bytes(body), True
+
+
+async def _aread_body(response: "httpx.Response", max_bytes: int) -> bytes:
+    """Read at most max_bytes of a streamed httpx response body."""
+    body = bytearray()
+    async for chunk in response.aiter_bytes():
+        body += chunk
+        if len(body) >= max_bytes:
+            break
+    return bytes(body[:max_bytes])
+
+
+# Number of URLs whose responses the internet tools keep
+RESPONSE_CACHE_SIZE = 256
+
+# Seconds a GET response is reused without a request when it has no
+# Cache-Control max-age of its own
+RESPONSE_CACHE_TTL = 60.0
+
+_MAX_AGE_RE = re.compile(r"\bmax-age\s*=\s*\"?(\d+)")
+
+
+class _CachedResponse(NamedTuple):
+    """Body and validators of a previous GET, for reuse and conditional requests."""
+    
+    etag: Optional[str]
+    last_modified: Optional[str]
+    body: bytes
+    encoding: str
+    complete: bool  # body holds the whole response, not just a prefix
+    lifetime: float  # seconds the response stays fresh
+    expires: float  # time.monotonic() until which no request is needed
+    
+    @property
+    def fresh(self) -> bool:
+        """Whether the response can be reused without asking the server."""
+        return time.monotonic() < self.expires
+    
+    def validators(self) -> dict[str, str]:
+        """Headers making a request for the same URL conditional."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+    
+    def text(self, max_bytes: int) -> str:
+        """Decode the first max_bytes of the body."""
+        return self.body[:max_bytes].decode(self.encoding, errors="replace")
+
+
+class _ResponseCache:
+    """LRU cache of GET responses, keyed by URL.
+    
+    A response is reused without a request while fresh: for its
+    Cache-Control max-age, or ttl seconds without one. After that it is
+    revalidated with its ETag or Last-Modified, if it has one. no-store
+    responses are never kept, and no-cache ones only for revalidation.
+    """
+    
+    def __init__(self, ttl: float = RESPONSE_CACHE_TTL, maxsize: int = RESPONSE_CACHE_SIZE):
+        """Initialize the cache.
+        
+        Args:
+            ttl: Freshness lifetime in seconds of responses without max-age
+            maxsize: Number of URLs kept
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, _CachedResponse] = OrderedDict()
+    
+    def _lifetime(self, cache_control: Optional[str]) -> Optional[float]:
+        """Freshness lifetime for a Cache-Control header, or None for no-store."""
+        if not cache_control:
+            return self.ttl
+        directives = cache_control.lower()
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return 0.0
+        match = _MAX_AGE_RE.search(directives)
+        return float(match.group(1)) if match else self.ttl
+    
+    def lookup(self, url: str, max_bytes: int) -> Optional[_CachedResponse]:
+        """Get the cached response for url if its body covers max_bytes.
+        
+        Args:
+            url: Requested URL
+            max_bytes: Number of body bytes the caller returns
+            
+        Returns:
+            The cached response (fresh or not), or None
+        """
+        cached = self._entries.get(url)
+        if cached is None or not (cached.complete or len(cached.body) >= max_bytes):
+            return None
+        self._entries.move_to_end(url)
+        return cached
+    
+    def store(
+        self, url: str, headers: Any, body: bytes, encoding: str, complete: bool
+    ) -> None:
+        """Keep a 200 response, if its headers allow reusing it.
+        
+        Args:
+            url: Requested URL
+            headers: Response headers
+            body: Body bytes read
+            encoding: Body encoding
+            complete: Whether body is the whole response
+        """
+        lifetime = self._lifetime(headers.get("Cache-Control"))
+        etag = headers.get("ETag")
+        last_modified = headers.get("Last-Modified")
+        if lifetime is None or not (lifetime > 0 or etag or last_modified):
+            self._entries.pop(url, None)
+            return
+        
+        self._entries[url] = _CachedResponse(
+            etag, last_modified, body, encoding, complete,
+            lifetime, time.monotonic() + lifetime
+        )
+        self._entries.move_to_end(url)
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        """Drop every cached response."""
+        self._entries.clear()
+    
+    def refresh(self, url: str, headers: Any) -> None:
+        """Start a new freshness lifetime for url after a 304.
+        
+        Args:
+            url: Requested URL
+            headers: Headers of the 304 response
+        """
+        cached = self._entries[url]
+        lifetime = cached.lifetime
+        if headers.get("Cache-Control"):
+            lifetime = self._lifetime(headers["Cache-Control"])
+            if lifetime is None:
+                del self._entries[url]
+                return
+        self._entries[url] = cached._replace(
+            lifetime=lifetime, expires=time.monotonic() + lifetime
+        )
 
 
 class InternetTool:
     """Make HTTP requests."""
     
-    def __init__(self, enabled: bool = True):
+    # Default sessions by pool_maxsize, shared by every InternetTool
+    _shared_sessions: dict[int, "requests.Session"] = {}
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        session: Optional["requests.Session"] = None,
+        pool_maxsize: int = 64,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
+    ):
         """Initialize internet tool.
         
+        Requests go through one session so keep-alive connections are
+        reused instead of paying a TCP/TLS handshake per call. The default
+        session is shared by all tools in the process, so a new tool (one
+        per agent) reuses the connections opened by earlier ones. It keeps
+        no cookies, so one agent's cookies never reach another's requests.
+        
         Args:
             enabled: Whether the tool is enabled
+            session: Session to use (if None, the shared pooled session with
+                retries, created on first request)
+            pool_maxsize: Connections kept open per host by the created session
+            cache_ttl: Seconds a GET response without max-age is reused
         """
         self.enabled = enabled
+        self.pool_maxsize = pool_maxsize
+        self._session = session
+        self._injected_session = session is not None
+        self._cache = _ResponseCache(ttl=cache_ttl)
     
-    def get(self, url: str, timeout: int = 10) -> ToolResult:
+    @property
+    def session(self) -> "requests.Session":
+        """Get the session, creating the shared one on first use."""
+        if self._session is None:
+            self._session = self._shared_sessions.get(self.pool_maxsize)
+        if self._session is None:
+            self._session = self._shared_sessions.setdefault(
+                self.pool_maxsize, self._create_session(self.pool_maxsize)
+            )
+        return self._session
+    
+    @staticmethod
+    def _create_session(pool_maxsize: int) -> "requests.Session":
+        """Create a session with a connection pool and retries.
+        
+        Args:
+            pool_maxsize: Connections kept open per host
+            
+        Returns:
+            Configured session
+        """
+        from http.cookiejar import DefaultCookiePolicy
+        
+        import requests
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+        
+        session = requests.Session()
+        # Shared across tools, so it must not carry cookies between them
+        session.cookies.set_policy(DefaultCookiePolicy(allowed_domains=[]))
+        # Connection failures and transient statuses are retried (GET only, as
+        # urllib3 skips non-idempotent methods). Read errors are not, so a slow
+        # server doesn't multiply the timeout, and the last response is returned
+        # so raise_for_status() reports it as usual.
+        retries = Retry(
+            total=2,
+            read=0,
+            backoff_factor=0.1,
+            status_forcelist=(429, 500, 502, 503, 504),
+            raise_on_status=False,
+        )
+        adapter = HTTPAdapter(
+            pool_connections=32,
+            pool_maxsize=pool_maxsize,
+            max_retries=retries,
+        )
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+    
+    def close(self) -> None:
+        """Drop cached responses and detach from the shared session.
+        
+        The shared session stays open, as other tools still use its
+        connections; this tool picks it up again on its next request. A
+        session passed in belongs to the caller, who closes it.
+        """
+        self._cache.clear()
+        if not self._injected_session:
+            self._session = None
+    
+    def get(self, url: str, timeout: int = 10, max_bytes: int = 5000) -> ToolResult:
         """Make a GET request.
         
+        Only the first max_bytes of the body are downloaded and decoded.
+        Responses are cached by URL: a repeated GET within the response's
+        max-age (or cache_ttl) is answered without a request, and after
+        that, if the response had an ETag or Last-Modified header, it is
+        sent conditionally and a 304 is answered from the cache.
+        
         Args:
             url: URL to request
             timeout: Timeout in seconds
+            max_bytes: Maximum number of body bytes to read
             
         Returns:
             ToolResult with response content
         """
         if not self.enabled:
+            return _INTERNET_DISABLED
+        
+        logger.info("GET request to: {}", url)
+        
+        cached = self._cache.lookup(url, max_bytes)
+        if cached is not None and cached.fresh:
+            logger.debug("Using cached response for {}", url)
+            return ToolResult(success=True, output=cached.text(max_bytes), error=None)
+        headers = cached.validators() if cached is not None else {}
+        
+        import requests
+        
+        try:
+            with self.session.get(url, timeout=timeout, stream=True, headers=headers) as response:
+                if response.status_code == 304 and cached is not None:
+                    logger.debug("Not modified, using cached body for {}", url)
+                    self._cache.refresh(url, response.headers)
+                    return ToolResult(success=True, output=cached.text(max_bytes), error=None)
+                
+                response.raise_for_status()
+                
+                # Stop reading once max_bytes arrived instead of loading the whole body
+                body, complete = _read_body(response, max_bytes)
+                encoding = response.encoding or "utf-8"
+                if response.status_code == 200:
+                    self._cache.store(url, response.headers, body, encoding, complete)
+            
+            return ToolResult(
+                success=True,
+                output=body.decode(encoding, errors="replace"),
+                error=None
+            )
+            
+        except requests.exceptions.Timeout:
             return ToolResult(
                 success=False,
                 output="",
-                error="Internet tool is disabled"
+                error=f"Request timed out after {timeout} seconds"
             )
+        except requests.exceptions.RequestException as e:
+            return ToolResult(
+                success=False,
+                output="",
+                error=str(e)
+            )
+    
+    def post(
+        self, url: str, data: Optional[dict] = None, timeout: int = 10, max_bytes: int = 5000
+    ) -> ToolResult:
+        """Make a POST request.
+        
+        Only the first max_bytes of the response body are downloaded and decoded.
+        
+        Args:
+            url: URL to request
+            data: Data to send
+            timeout: Timeout in seconds
+            max_bytes: Maximum number of body bytes to read
+            
+        Returns:
+            ToolResult with response content
+        """
+        if not self.enabled:
+            return _INTERNET_DISABLED
         
-        logger.info(f"GET request to: {url}")
+        logger.info("POST request to: {}", url)
+        import requests
         
         try:
-            response = requests.get(url, timeout=timeout)
-            response.raise_for_status()
+            with self.session.post(
+                url, timeout=timeout, stream=True, **_json_body(data)
+            ) as response:
+                response.raise_for_status()
+                body, _ = _read_body(response, max_bytes)
+                encoding = response.encoding or "utf-8"
             
             return ToolResult(
                 success=True,
-                output=response.text[:5000],  # Limit output size
+                output=body.decode(encoding, errors="replace"),
                 error=None
             )
             
@@ -133,44 +974,157 @@ class InternetTool:
                 output="",
                 error=str(e)
             )
+
+
+class AsyncInternetTool:
+    """Make HTTP requests from async code.
+    
+    Concurrent requests share one HTTP/2 client, so calls to the same host
+    are multiplexed over a single connection.
+    """
+    
+    def __init__(
+        self,
+        enabled: bool = True,
+        client: Optional["httpx.AsyncClient"] = None,
+        cache_ttl: float = RESPONSE_CACHE_TTL,
+    ):
+        """Initialize async internet tool.
+        
+        Args:
+            enabled: Whether the tool is enabled
+            client: Client to use (created on first request if None)
+            cache_ttl: Seconds a GET response without max-age is reused
+        """
+        self.enabled = enabled
+        self._client = client
+        self._cache = _ResponseCache(ttl=cache_ttl)
+    
+    @property
+    def client(self) -> "httpx.AsyncClient":
+        """Get the shared client, creating it on first use."""
+        if self._client is None:
+            import httpx
+            
+            self._client = httpx.AsyncClient(
+                http2=True,
+                limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+            )
+        return self._client
     
-    def post(self, url: str, data: Optional[dict] = None, timeout: int = 10) -> ToolResult:
-        """Make a POST request.
+    async def aclose(self) -> None:
+        """Close the client; the next request creates a new one."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def get(self, url: str, timeout: int = 10, max_bytes: int = 5000) -> ToolResult:
+        """Make a GET request.
+        
+        Only the first max_bytes of the body are downloaded and decoded.
+        Responses are cached and revalidated like in InternetTool.get(), so
+        a URL fetched again within its freshness lifetime costs no request.
         
         Args:
             url: URL to request
-            data: Data to send
             timeout: Timeout in seconds
+            max_bytes: Maximum number of body bytes to read
             
         Returns:
             ToolResult with response content
         """
         if not self.enabled:
+            return _INTERNET_DISABLED
+        
+        logger.info("GET request to: {}", url)
+        
+        cached = self._cache.lookup(url, max_bytes)
+        if cached is not None and cached.fresh:
+            logger.debug("Using cached response for {}", url)
+            return ToolResult(success=True, output=cached.text(max_bytes), error=None)
+        headers = cached.validators() if cached is not None else {}
+        
+        import httpx
+        
+        try:
+            async with self.client.stream("GET", url, timeout=timeout, headers=headers) as response:
+                if response.status_code == 304 and cached is not None:
+                    logger.debug("Not modified, using cached body for {}", url)
+                    self._cache.refresh(url, response.headers)
+                    return ToolResult(success=True, output=cached.text(max_bytes), error=None)
+                
+                response.raise_for_status()
+                
+                # Read one byte past max_bytes to tell whether the body is complete
+                body = await _aread_body(response, max_bytes + 1)
+                complete = len(body) <= max_bytes
+                body = body[:max_bytes]
+                encoding = response.encoding or "utf-8"
+                if response.status_code == 200:
+                    self._cache.store(url, response.headers, body, encoding, complete)
+            
+            return ToolResult(
+                success=True,
+                output=body.decode(encoding, errors="replace"),
+                error=None
+            )
+            
+        except httpx.TimeoutException:
+            return ToolResult(
+                success=False,
+                output="",
+                error=f"Request timed out after {timeout} seconds"
+            )
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
             return ToolResult(
                 success=False,
                 output="",
-                error="Internet tool is disabled"
+                error=str(e)
             )
+    
+    async def post(
+        self, url: str, data: Optional[dict] = None, timeout: int = 10, max_bytes: int = 5000
+    ) -> ToolResult:
+        """Make a POST request.
         
-        logger.info(f"POST request to: {url}")
+        Only the first max_bytes of the response body are downloaded and decoded.
+        
+        Args:
+            url: URL to request
+            data: Data to send
+            timeout: Timeout in seconds
+            max_bytes: Maximum number of body bytes to read
+            
+        Returns:
+            ToolResult with response content
+        """
+        if not self.enabled:
+            return _INTERNET_DISABLED
+        
+        logger.info("POST request to: {}", url)
+        import httpx
         
         try:
-            response = requests.post(url, json=data, timeout=timeout)
-            response.raise_for_status()
+            async with self.client.stream(
+                "POST", url, timeout=timeout, **_json_body(data, body_arg="content")
+            ) as response:
+                response.raise_for_status()
+                body = await _aread_body(response, max_bytes)
+                encoding = response.encoding or "utf-8"
             
             return ToolResult(
                 success=True,
-                output=response.text[:5000],
+                output=body.decode(encoding, errors="replace"),
                 error=None
             )
             
-        except requests.exceptions.Timeout:
+        except httpx.TimeoutException:
             return ToolResult(
                 success=False,
                 output="",
                 error=f"Request timed out after {timeout} seconds"
             )
-        except requests.exceptions.RequestException as e:
+        except (httpx.HTTPError, httpx.InvalidURL) as e:
             return ToolResult(
                 success=False,
                 output="",
@@ -0,0 +1,296 @@
+"""On-disk cache of DeepEval metric results.
+
+Judge calls dominate the DeepEval tests, and a test case whose input,
+outputs and context are unchanged gets the same verdict again. Results
+are stored under .deepeval_cache/, one JSON file per SHA-256 key over
+everything that affects the verdict, so reruns only pay for changed cases.
+
+evaluate_cached() judges many cases at once: uncached metrics are
+measured concurrently, throttled by a TokenBucket sized from
+DEEPEVAL_RPM / DEEPEVAL_TPM so bursts stay under the provider's limits.
+
+DEEPEVAL_CACHE_MODE selects the policy:
+    enabled (default): use cached results, measure and store the rest
+    replay: use cached results only, a miss fails the test (no API calls)
+    disabled: always measure, never read or write the cache
+
+Delete the directory (or run once with "disabled") to re-judge everything.
+"""
+
+from pathlib import Path
+from typing import Any, Optional
+import asyncio
+import hashlib
+import os
+import time
+
+import orjson
+import pytest
+
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".deepeval_cache"
+
+CACHE_MODES = ("enabled", "replay", "disabled")
+
+# Judge calls a metric makes per measure (statements, verdicts, reason) and
+# the prompt tokens they add around the test case, for rate limiting
+_CALLS_PER_MEASURE = 3
+_JUDGE_PROMPT_TOKENS = 1500
+
+
+def cache_mode() -> str:
+    """Get the cache policy from DEEPEVAL_CACHE_MODE."""
+    mode = os.getenv("DEEPEVAL_CACHE_MODE", "enabled").lower()
+    if mode not in CACHE_MODES:
+        raise ValueError(f"DEEPEVAL_CACHE_MODE must be one of {CACHE_MODES}, got {mode!r}")
+    return mode
+
+
+def cache_key(test_case: Any, metric: Any) -> str:
+    """SHA-256 over the test case fields and the metric's configuration.
+    
+    Args:
+        test_case: LLMTestCase being evaluated
+        metric: DeepEval metric judging it
+    
+    Returns:
+        Hex digest identifying the verdict
+    """
+    payload = {
+        "input": test_case.input,
+        "actual_output": test_case.actual_output,
+        "expected_output": test_case.expected_output,
+        "context": test_case.context,
+        "retrieval_context": test_case.retrieval_context,
+        "metric": type(metric).__name__,
+        # GEval metrics differ only by their rubric
+        "criteria": getattr(metric, "criteria", None),
+        "evaluation_steps": getattr(metric, "evaluation_steps", None),
+        "model": getattr(metric, "evaluation_model", None),
+        "threshold": metric.threshold,
+    }
+    return hashlib.sha256(orjson.dumps(payload, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _load(key: str) -> Optional[dict]:
+    """Read a cached result, or None if there is none."""
+    try:
+        return orjson.loads((CACHE_DIR / f"{key}.json").read_bytes())
+    except FileNotFoundError:
+        return None
+
+
+def _store(key: str, result: dict) -> None:
+    """Write a result atomically, so parallel workers never see partial files."""
+    CACHE_DIR.mkdir(exist_ok=True)
+    tmp_path = CACHE_DIR / f"{key}.{os.getpid()}.tmp"
+    tmp_path.write_bytes(orjson.dumps(result))
+    tmp_path.replace(CACHE_DIR / f"{key}.json")
+
+
+def _verdict(metric: Any, result: dict) -> dict:
+    """Attach the metric's name and threshold to a stored result."""
+    # deepeval metrics name themselves (e.g. "Parse Quality [GEval]")
+    name = getattr(metric, "__name__", type(metric).__name__)
+    return {**result, "metric": name, "threshold": metric.threshold}
+
+
+def _lookup(test_case: Any, metric: Any, mode: str) -> Optional[dict]:
+    """Get the cached verdict for a metric, honouring the cache mode.
+    
+    Returns:
+        The verdict, or None if the metric has to be measured
+    """
+    if mode == "disabled":
+        return None
+    key = cache_key(test_case, metric)
+    result = _load(key)
+    if result is None and mode == "replay":
+        pytest.fail(
+            f"No cached {type(metric).__name__} result for {test_case.input!r} "
+            f"(key {key[:12]}) and DEEPEVAL_CACHE_MODE=replay"
+        )
+    return _verdict(metric, result) if result is not None else None
+
+
+def _record(test_case: Any, metric: Any, mode: str) -> dict:
+    """Store the result of a metric that was just measured."""
+    result = {
+        "passed": bool(metric.is_successful()),
+        "score": metric.score,
+        "reason": metric.reason,
+    }
+    if mode != "disabled":
+        _store(cache_key(test_case, metric), result)
+    return _verdict(metric, result)
+
+
+def assert_verdicts(verdicts: list[dict]) -> None:
+    """Fail with deepeval's message format if any verdict did not pass.
+    
+    Raises:
+        AssertionError: If any metric failed
+    """
+    failures = [
+        f"{v['metric']} (score: {v['score']}, threshold: {v['threshold']}, reason: {v['reason']})"
+        for v in verdicts
+        if not v["passed"]
+    ]
+    assert not failures, f"Metrics: {', '.join(failures)} failed."
+
+
+def cached_assert_test(test_case: Any, metrics: list) -> None:
+    """Drop-in for deepeval.assert_test that reuses cached verdicts.
+    
+    Metrics without a cached result are measured directly with
+    metric.measure(), which is what assert_test runs for each metric,
+    and their {passed, score, reason} is stored.
+    
+    Args:
+        test_case: LLMTestCase to evaluate
+        metrics: Metrics that must all pass
+    
+    Raises:
+        AssertionError: If any metric fails
+    """
+    mode = cache_mode()
+    if mode == "disabled":
+        from deepeval import assert_test
+        
+        assert_test(test_case, metrics)
+        return
+    
+    verdicts = []
+    for metric in metrics:
+        verdict = _lookup(test_case, metric, mode)
+        if verdict is None:
+            metric.measure(test_case)
+            verdict = _record(test_case, metric, mode)
+        verdicts.append(verdict)
+    assert_verdicts(verdicts)
+
+
+class TokenBucket:
+    """Rate limiter over judge requests and tokens per minute.
+    
+    Both budgets refill continuously up to one minute's worth. acquire()
+    waits until both cover a call, so concurrent measures stay under the
+    provider's RPM/TPM limits instead of running into 429 responses.
+    """
+    
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        """Initialize with full budgets.
+        
+        Args:
+            requests_per_minute: Request limit
+            tokens_per_minute: Token limit
+        """
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self._requests = requests_per_minute
+        self._tokens = tokens_per_minute
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    def _refill(self) -> None:
+        """Add the budget accrued since the last call."""
+        now = time.monotonic()
+        elapsed, self._updated = now - self._updated, now
+        self._requests = min(
+            self.requests_per_minute, self._requests + elapsed * self.requests_per_minute / 60
+        )
+        self._tokens = min(
+            self.tokens_per_minute, self._tokens + elapsed * self.tokens_per_minute / 60
+        )
+    
+    async def acquire(self, requests: int, tokens: int) -> None:
+        """Wait until the budgets cover a call, then take it from them.
+        
+        Args:
+            requests: Requests the call makes
+            tokens: Tokens the call is expected to use
+        """
+        requests = min(requests, self.requests_per_minute)
+        tokens = min(tokens, self.tokens_per_minute)
+        async with self._lock:
+            self._refill()
+            while self._requests < requests or self._tokens < tokens:
+                await asyncio.sleep(max(
+                    (requests - self._requests) * 60 / self.requests_per_minute,
+                    (tokens - self._tokens) * 60 / self.tokens_per_minute,
+                ))
+                self._refill()
+            self._requests -= requests
+            self._tokens -= tokens
+
+
+def _estimate_tokens(test_case: Any) -> int:
+    """Rough token count of one judge call about a test case (4 chars per token)."""
+    fields = [test_case.input, test_case.actual_output, test_case.expected_output]
+    fields += test_case.context or []
+    fields += test_case.retrieval_context or []
+    return _JUDGE_PROMPT_TOKENS + sum(len(field or "") for field in fields) // 4
+
+
+async def _measure_all(pending: list[tuple[Any, Any]], max_concurrent: int) -> None:
+    """Measure metrics concurrently, throttled by a TokenBucket.
+    
+    Args:
+        pending: (test_case, metric) pairs to measure
+        max_concurrent: Most measures in flight at once
+    """
+    semaphore = asyncio.Semaphore(max_concurrent)
+    bucket = TokenBucket(
+        float(os.getenv("DEEPEVAL_RPM", "500")), float(os.getenv("DEEPEVAL_TPM", "200000"))
+    )
+    
+    async def measure(test_case: Any, metric: Any) -> None:
+        async with semaphore:
+            await bucket.acquire(
+                _CALLS_PER_MEASURE, _CALLS_PER_MEASURE * _estimate_tokens(test_case)
+            )
+            await metric.a_measure(test_case)
+    
+    try:
+        await asyncio.gather(*(measure(test_case, metric) for test_case, metric in pending))
+    finally:
+        # Judge clients are bound to this loop, which asyncio.run() closes next
+        from deepeval_gpt5_nano import close_async_clients
+        
+        await close_async_clients()
+
+
+def evaluate_cached(
+    jobs: dict[str, tuple[Any, list]], max_concurrent: int = 8
+) -> dict[str, list[dict]]:
+    """Judge many test cases in one concurrent batch.
+    
+    Cached verdicts are reused as in cached_assert_test(); the remaining
+    metrics are measured at the same time, so the batch takes about as
+    long as its slowest judge call instead of the sum of them.
+    
+    Args:
+        jobs: Name -> (test_case, metrics) for each case
+        max_concurrent: Most measures in flight at once
+        
+    Returns:
+        Name -> one verdict per metric, for assert_verdicts()
+    """
+    mode = cache_mode()
+    verdicts = {name: [] for name in jobs}
+    pending = []
+    for name, (test_case, metrics) in jobs.items():
+        for metric in metrics:
+            verdict = _lookup(test_case, metric, mode)
+            verdicts[name].append(verdict)
+            if verdict is None:
+                pending.append((test_case, metric))
+    
+    if pending:
+        asyncio.run(_measure_all(pending, max_concurrent))
+    
+    for name, (test_case, metrics) in jobs.items():
+        verdicts[name] = [
+            verdict if verdict is not None else _record(test_case, metric, mode)
+            for metric, verdict in zip(metrics, verdicts[name])
+        ]
+    return verdicts
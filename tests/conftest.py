@@ -1,18 +1,29 @@
 """Test configuration and fixtures."""
 
+import sys
 import pytest
 from pathlib import Path
 
-from src.config import Settings
 
+def pytest_configure(config):
+    """Put the tests directory on sys.path once per session.
+    
+    Test helpers such as deepeval_gpt5_nano and _deepeval_cache are then
+    importable by name from every test module.
+    """
+    tests_dir = str(Path(__file__).parent)
+    if tests_dir not in sys.path:
+        sys.path.insert(0, tests_dir)
 
-@pytest.fixture
-def test_settings():
-    """Create test settings."""
-    return Settings(
+def _make_test_settings(**overrides):
+    """Build test settings, with overrides applied on top of the defaults."""
+    from src.config import Settings
+    
+    values = dict(
         model_path=Path("./LFM2.5-1.2B-Instruct-Q4_K_M.gguf"),
         model_n_ctx=512,  # Smaller for tests
         model_n_gpu_layers=0,
+        model_kv_state_path=None,  # Don't touch the user's cache
         model_temperature=0.7,
         max_iterations=3,  # Fewer iterations for tests
         max_reasoning_steps=2,
@@ -20,19 +31,81 @@ def test_settings():
         enable_internet=False,
         log_level="WARNING",
     )
+    values.update(overrides)
+    return Settings(**values)
+
+
+@pytest.fixture
+def test_settings():
+    """Create test settings."""
+    return _make_test_settings()
+
+
+@pytest.fixture(scope="session")
+def loaded_agent():
+    """
+    Agent with the model loaded, shared by every test in the session.
+    
+    Loading the weights dominates tests that only exercise the parser or
+    the tools, so it happens once. Tests must not change its settings.
+    """
+    from src.agent import Agent
+    
+    agent = Agent(_make_test_settings())
+    agent.load()
+    return agent
+
+
+@pytest.fixture(scope="session")
+def loaded_agent_with_terminal(loaded_agent):
+    """
+    Session-wide agent with the terminal tool enabled.
+    
+    Tools are set up from the settings when the agent is built, so this is
+    a second agent; it reuses loaded_agent's model instead of loading the
+    weights again.
+    """
+    from src.agent import Agent
+    
+    agent = Agent(_make_test_settings(enable_terminal=True))
+    agent.llm_engine = loaded_agent.llm_engine
+    agent._system_tokens = loaded_agent._system_tokens
+    return agent
 
 
 @pytest.fixture
 def mock_model(monkeypatch):
     """Mock the LLM model for testing."""
     class MockLlama:
+        def __init__(self):
+            self.eval_tokens = []
+
         def __call__(self, prompt, **kwargs):
             return {
                 "choices": [{
                     "text": "Test output"
                 }]
             }
-    
+
+        def tokenize(self, text, add_bos=True, special=False):
+            return list(text)
+
+        def detokenize(self, tokens, prev_tokens=None, special=False):
+            return bytes(tokens)
+
+        def token_eos(self):
+            return -1
+
+        def generate(self, tokens, **kwargs):
+            yield from b"Test output"
+            yield -1
+
+        def reset(self):
+            pass
+
+        def eval(self, tokens):
+            pass
+
     def mock_load(self):
         self._model = MockLlama()
     
@@ -42,13 +115,14 @@ def mock_model(monkeypatch):
     return MockLlama()
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 def gpt5_nano_model():
     """
     Fixture providing GPT-5-nano model for DeepEval tests.
     
     Uses the Responses API optimized for high-throughput classification.
-    Skips gracefully if OPENAI_API_KEY is not set.
+    Skips gracefully if OPENAI_API_KEY is not set. Session-scoped: the
+    model holds no per-test state, so one instance serves every test.
     """
     import os
     
@@ -3,7 +3,67 @@
 from typing import Optional, Dict, Any
 from deepeval.models import DeepEvalBaseLLM
 from pydantic import BaseModel, SecretStr
+import asyncio
 import os
+import weakref
+
+
+# OpenAI clients shared by every model instance, keyed by API key, so all
+# evaluators reuse one HTTP/2 keep-alive pool to api.openai.com
+_CLIENT_CACHE: Dict[str, Any] = {}
+# Async clients are bound to the event loop they run on: one set per loop
+_ASYNC_CLIENT_CACHE: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, Any]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _http_limits():
+    """Connection limits for the shared OpenAI HTTP clients."""
+    import httpx
+    return httpx.Limits(max_keepalive_connections=20)
+
+
+def _shared_client(api_key: str):
+    """Get the process-wide OpenAI client for an API key."""
+    if api_key not in _CLIENT_CACHE:
+        try:
+            import httpx
+            from openai import OpenAI
+        except ImportError:
+            raise ImportError("OpenAI package required. Install with: pip install openai")
+        _CLIENT_CACHE[api_key] = OpenAI(
+            api_key=api_key,
+            http_client=httpx.Client(http2=True, limits=_http_limits()),
+        )
+    return _CLIENT_CACHE[api_key]
+
+
+def _shared_async_client(api_key: str):
+    """Get the AsyncOpenAI client for an API key on the running event loop."""
+    clients = _ASYNC_CLIENT_CACHE.setdefault(asyncio.get_running_loop(), {})
+    if api_key not in clients:
+        try:
+            import httpx
+            from openai import AsyncOpenAI
+        except ImportError:
+            raise ImportError("OpenAI package required. Install with: pip install openai")
+        clients[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            http_client=httpx.AsyncClient(http2=True, limits=_http_limits()),
+        )
+    return clients[api_key]
+
+
+async def close_async_clients() -> None:
+    """Close the AsyncOpenAI clients of the running event loop.
+    
+    Await this before the loop ends (e.g. at the end of a coroutine passed
+    to asyncio.run()): the clients cannot be used on another loop, and
+    their connections would otherwise stay open until garbage collection.
+    """
+    clients = _ASYNC_CLIENT_CACHE.pop(asyncio.get_running_loop(), {})
+    for client in clients.values():
+        await client.close()
 
 
 class GPT5NanoResponsesModel(DeepEvalBaseLLM):
@@ -45,13 +105,16 @@ class GPT5NanoResponsesModel(DeepEvalBaseLLM):
                 "OpenAI API key is required. "
                 "Set OPENAI_API_KEY environment variable or pass api_key parameter."
             )
-        
-        # Import here to avoid issues if openai is not installed
-        try:
-            from openai import OpenAI
-            self.client = OpenAI(api_key=self.api_key)
-        except ImportError:
-            raise ImportError("OpenAI package required. Install with: pip install openai")
+
+    @property
+    def client(self):
+        """Shared OpenAI client, created on first use so openai is only imported when needed."""
+        return _shared_client(self.api_key)
+
+    @property
+    def async_client(self):
+        """Shared AsyncOpenAI client for the running event loop, used by a_generate."""
+        return _shared_async_client(self.api_key)
 
     def load_model(self):
         """Load the model (no-op for API-based models)."""
@@ -74,45 +137,63 @@ class GPT5NanoResponsesModel(DeepEvalBaseLLM):
         Returns:
             Generated response text
         """
+        client = self.client  # imports openai, with an install hint if missing
+        from openai import OpenAIError
+        
         try:
-            # Call Responses API
-            response = self.client.responses.create(
-                model=self.model_name,
-                input=prompt,
-                max_output_tokens=max_tokens or 1024,
-                text={
-                    "verbosity": self.verbosity
-                },
-                reasoning={
-                    "effort": self.reasoning_effort
-                }
-            )
-            
-            # Extract text from response
-            # Response object structure: response.output is a LIST of items
-            # Output messages have: response.output[i].content[0].text
-            if hasattr(response, 'output') and response.output:
-                # Find ResponseOutputMessage in the output list
-                for item in response.output:
-                    if hasattr(item, 'type') and item.type == 'message':
-                        if hasattr(item, 'content') and item.content:
-                            # Content is also a list of ResponseOutputText items
-                            for content_item in item.content:
-                                if hasattr(content_item, 'text'):
-                                    return content_item.text
-            
-            # Fallback: try simple attribute access
-            if hasattr(response, 'text'):
-                return response.text
-            
-            # Last resort: return string representation
-            return str(response)
-                
-        except Exception as e:
-            # Fallback for API errors
+            response = client.responses.create(**self._request_kwargs(prompt, max_tokens))
+        except OpenAIError as e:
+            # API errors only; bugs in the request building propagate as they are
             raise RuntimeError(
                 f"Error calling OpenAI Responses API with gpt-5-nano: {str(e)}"
-            )
+            ) from e
+        
+        return self._extract_text(response)
+
+    def _request_kwargs(self, prompt: str, max_tokens: Optional[int]) -> Dict[str, Any]:
+        """Build the Responses API request for a prompt."""
+        return {
+            "model": self.model_name,
+            "input": prompt,
+            "max_output_tokens": max_tokens or 1024,
+            "text": {
+                "verbosity": self.verbosity
+            },
+            "reasoning": {
+                "effort": self.reasoning_effort
+            },
+        }
+
+    @staticmethod
+    def _extract_text(response: Any) -> str:
+        """
+        Extract the generated text from a Responses API response.
+        
+        Uses the SDK's output_text (message text already joined) and only
+        walks response.output when it is missing or empty.
+        """
+        text = getattr(response, "output_text", None)
+        if text:
+            return text
+        
+        # Response object structure: response.output is a LIST of items
+        # Output messages have: response.output[i].content[0].text
+        if hasattr(response, 'output') and response.output:
+            # Find ResponseOutputMessage in the output list
+            for item in response.output:
+                if hasattr(item, 'type') and item.type == 'message':
+                    if hasattr(item, 'content') and item.content:
+                        # Content is also a list of ResponseOutputText items
+                        for content_item in item.content:
+                            if hasattr(content_item, 'text'):
+                                return content_item.text
+        
+        # Fallback: try simple attribute access
+        if hasattr(response, 'text'):
+            return response.text
+        
+        # Last resort: return string representation
+        return str(response)
 
     def get_model_name(self) -> str:
         """Return the model name."""
@@ -138,21 +219,36 @@ class GPT5NanoResponsesModel(DeepEvalBaseLLM):
     async def a_generate(
         self,
         prompt: str,
+        max_tokens: Optional[int] = None,
         **kwargs
     ) -> str:
         """
         Async version of generate.
         
+        Awaits AsyncOpenAI so DeepEval's async runner can keep several
+        evaluation calls in flight instead of serializing them.
+        
         Args:
             prompt: Input prompt
+            max_tokens: Maximum output tokens
             **kwargs: Additional parameters
             
         Returns:
             Generated response
         """
-        # For now, just call the sync version
-        # In a real implementation, this would use async/await
-        return self.generate(prompt, **kwargs)
+        client = self.async_client
+        from openai import OpenAIError
+        
+        try:
+            response = await client.responses.create(
+                **self._request_kwargs(prompt, max_tokens)
+            )
+        except OpenAIError as e:
+            raise RuntimeError(
+                f"Error calling OpenAI Responses API with gpt-5-nano: {str(e)}"
+            ) from e
+        
+        return self._extract_text(response)
 
     @property
     def id(self) -> str:
@@ -1,8 +1,10 @@
 """Tests for agent core functionality."""
 
+import dataclasses
+
 import pytest
 
-from src.agent import Agent, Task, ReasoningStep
+from src.agent import TOOL_CALL_GRAMMAR, Agent, Task, ReasoningStep, ToolCall
 
 
 class TestTask:
@@ -22,6 +24,15 @@ class TestTask:
         task.status = "completed"
         
         assert task.status == "completed"
+    
+    def test_task_is_slotted(self):
+        """Test that tasks carry no per-instance __dict__."""
+        task = Task(id=1, description="Test task")
+        
+        assert not hasattr(task, "__dict__")
+        assert dataclasses.asdict(task) == {
+            "id": 1, "description": "Test task", "status": "pending"
+        }
 
 
 class TestReasoningStep:
@@ -97,6 +108,103 @@ class TestAgent:
         
         assert "unknown" in result.lower()
     
+    def test_execute_tool_calls_preserves_order(self, test_settings):
+        """Test that concurrent tool calls return results in call order."""
+        agent = Agent(test_settings)
+        results = agent._execute_tool_calls([
+            ToolCall("terminal", {"command": "echo test"}),
+            ToolCall("internet", {"url": "https://example.com"}),
+        ])
+        agent.close()
+        
+        assert len(results) == 2
+        assert "terminal" in results[0].lower()
+        assert "internet" in results[1].lower()
+    
+    def test_execute_tool_calls_share_persistent_shell(self, test_settings, tmp_path):
+        """Test that several calls in one step run in order in the persistent shell."""
+        agent = Agent(test_settings.model_copy(update={"enable_terminal": True}))
+        try:
+            results = agent._execute_tool_calls([
+                ToolCall("terminal", {"command": f"cd {tmp_path}"}),
+                ToolCall("internet", {"url": "https://example.com"}),
+                ToolCall("terminal", {"command": "pwd"}),
+            ])
+            
+            assert results[2] == f"Command executed successfully:\n{tmp_path}"
+            assert agent.terminal_tool.execute("pwd").output == str(tmp_path)
+        finally:
+            agent.close()
+    
+    def test_close_releases_tools(self, test_settings):
+        """Test that close() stops the persistent shell and detaches the session."""
+        agent = Agent(test_settings.model_copy(update={"enable_terminal": True}))
+        agent.terminal_tool.execute("echo test")
+        agent.internet_tool.session
+        
+        agent.close()
+        
+        assert agent.terminal_tool._shell is None
+        assert agent.internet_tool._session is None
+    
+    def test_tool_call_grammar_compiles(self):
+        """Test that the tool call GBNF grammar is accepted by llama.cpp."""
+        from llama_cpp import LlamaGrammar
+        
+        grammar = LlamaGrammar.from_string(TOOL_CALL_GRAMMAR, verbose=False)
+        
+        assert grammar is not None
+    
+    def test_reason_and_act_reuses_cached_response(self, test_settings, monkeypatch):
+        """Test that identical tool results skip the follow-up generation."""
+        agent = Agent(test_settings)
+        prompts = []
+        
+        def fake_generate_stream(prompt, **kwargs):
+            prompts.append(prompt)
+            return '<|tool_call_start|>[terminal(command="ls")]', "<|tool_call_end|>"
+        
+        def fake_generate(prompt, **kwargs):
+            prompts.append(prompt)
+            return "Interpreted result"
+        
+        monkeypatch.setattr(agent.llm_engine, "generate_stream", fake_generate_stream)
+        monkeypatch.setattr(agent.llm_engine, "generate", fake_generate)
+        task = Task(id=1, description="List files")
+        
+        first = agent.reason_and_act(task)
+        second = agent.reason_and_act(task)
+        
+        assert first.thought == second.thought == "Interpreted result"
+        assert len(prompts) == 3
+    
+    def test_run_writes_results(self, test_settings, monkeypatch, tmp_path):
+        """Test that run writes its results as JSON when given a path."""
+        import json
+        
+        agent = Agent(test_settings)
+        monkeypatch.setattr(agent, "create_task_list", lambda goal: [])
+        results_path = tmp_path / "results.json"
+        
+        results = agent.run("Do nothing", results_path=results_path)
+        
+        assert json.loads(results_path.read_text()) == results
+    
+    def test_guided_tool_turn_formats_tool_call(self, test_settings):
+        """Test that a guidance tool choice is rendered as an LFM2.5 tool call."""
+        class FakeGuidanceModel:
+            def __add__(self, program):
+                return {"tool": "terminal", "argument": "ls -la"}
+        
+        agent = Agent(test_settings)
+        agent._guidance_model = FakeGuidanceModel()
+        
+        response = agent._guided_tool_turn("prompt")
+        
+        assert agent._parse_tool_calls(response) == [
+            ToolCall("terminal", {"command": "ls -la"})
+        ]
+    
     def test_build_context_empty(self, test_settings):
         """Test building context with no steps."""
         agent = Agent(test_settings)
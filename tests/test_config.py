@@ -11,10 +11,14 @@ def test_settings_defaults():
     settings = Settings()
     
     assert settings.model_n_ctx == 4096
+    assert settings.model_n_batch == 512
+    assert settings.model_kv_cache_type == "q8_0"
+    assert settings.model_n_gpu_layers == -1
     assert settings.model_temperature == 0.7
     assert settings.max_iterations == 10
     assert settings.enable_terminal is True
     assert settings.enable_internet is True
+    assert settings.tool_call_mode == "free"
 
 
 def test_settings_custom():
@@ -36,3 +40,16 @@ def test_get_settings():
     """Test get_settings function."""
     settings = get_settings()
     assert isinstance(settings, Settings)
+
+
+def test_get_settings_is_cached(monkeypatch):
+    """Test that get_settings reads the environment only once."""
+    get_settings.cache_clear()
+    first = get_settings()
+    
+    monkeypatch.setenv("MAX_ITERATIONS", "42")
+    assert get_settings() is first
+    
+    get_settings.cache_clear()
+    assert get_settings().max_iterations == 42
+    get_settings.cache_clear()
@@ -0,0 +1,247 @@
+"""Tests for the LLM engine wrapper."""
+
+import numpy as np
+import pytest
+from llama_cpp.llama import LlamaState
+
+from src.agent import Agent
+from src.llm import LLMEngine
+
+
+class CharLlama:
+    """Fake llama.cpp model with one token per character."""
+    
+    EOS = -1
+    
+    def __init__(self, output):
+        self.output = output
+        self.consumed = 0
+    
+    def tokenize(self, text, add_bos=True, special=False):
+        return [ord(c) for c in text.decode("utf-8")]
+    
+    def detokenize(self, tokens, prev_tokens=None, special=False):
+        return "".join(chr(t) for t in tokens).encode("utf-8")
+    
+    def token_eos(self):
+        return self.EOS
+    
+    def generate(self, tokens, **kwargs):
+        for c in self.output:
+            self.consumed += 1
+            yield ord(c)
+        yield self.EOS
+
+
+class TestGenerateStream:
+    """Tests for LLMEngine.generate_stream."""
+    
+    def test_stops_on_tool_call_end(self, test_settings):
+        """Test that generation stops once the tool call is closed."""
+        engine = LLMEngine(test_settings)
+        call = '<|tool_call_start|>[terminal(command="ls")]'
+        engine._model = CharLlama(call + "<|tool_call_end|> and more text<|im_end|>")
+        
+        text, stopped_on = engine.generate_stream(
+            "prompt", stop=["<|im_end|>", "<|tool_call_end|>"]
+        )
+        
+        assert text == call
+        assert stopped_on == "<|tool_call_end|>"
+        assert engine._model.consumed == len(call + "<|tool_call_end|>")
+    
+    def test_no_stop_sequence(self, test_settings):
+        """Test that the full text is returned when no stop sequence appears."""
+        engine = LLMEngine(test_settings)
+        engine._model = CharLlama("Hello world")
+        
+        text, stopped_on = engine.generate_stream("prompt", stop=["<|im_end|>"])
+        
+        assert text == "Hello world"
+        assert stopped_on is None
+    
+    def test_max_tokens(self, test_settings):
+        """Test that generation stops after max_tokens."""
+        engine = LLMEngine(test_settings)
+        engine._model = CharLlama("Hello world")
+        
+        text, stopped_on = engine.generate_stream("prompt", max_tokens=5)
+        
+        assert text == "Hello"
+        assert stopped_on is None
+
+
+class PrefillLlama(CharLlama):
+    """Fake llama.cpp model that records evaluated tokens."""
+    
+    def __init__(self):
+        super().__init__("")
+        self.eval_tokens = []
+        self.evaluated = []
+    
+    def reset(self):
+        self.eval_tokens = []
+    
+    def eval(self, tokens):
+        self.evaluated.append(list(tokens))
+        self.eval_tokens = self.eval_tokens + list(tokens)
+
+
+class TestPrefill:
+    """Tests for LLMEngine.prefill."""
+    
+    def test_prefill_extends_cached_prefix(self, test_settings):
+        """Test that only the new suffix is evaluated when the prefix is cached."""
+        engine = LLMEngine(test_settings)
+        engine._model = PrefillLlama()
+        
+        engine.prefill("system")
+        engine.prefill("system user")
+        
+        assert engine._model.evaluated[-1] == [ord(c) for c in " user"]
+    
+    def test_prefill_rebuilds_on_mismatch(self, test_settings):
+        """Test that a different prompt is evaluated from scratch."""
+        engine = LLMEngine(test_settings)
+        engine._model = PrefillLlama()
+        
+        engine.prefill("system")
+        tokens = engine.prefill("other")
+        
+        assert engine._model.evaluated[-1] == tokens
+        assert engine._model.eval_tokens == tokens
+
+
+class StateLlama(PrefillLlama):
+    """Fake llama.cpp model with save_state/load_state."""
+    
+    def __init__(self):
+        super().__init__()
+        self.kv = b""
+    
+    def n_ctx(self):
+        return 64
+    
+    def n_vocab(self):
+        return 8
+    
+    def eval(self, tokens):
+        super().eval(tokens)
+        self.kv = bytes(t % 256 for t in self.eval_tokens)
+    
+    def save_state(self):
+        return LlamaState(
+            input_ids=np.array(self.eval_tokens + [0] * 8, dtype=np.intc),
+            scores=np.zeros((1, 8), dtype=np.single),
+            n_tokens=len(self.eval_tokens),
+            llama_state=self.kv,
+            llama_state_size=len(self.kv),
+            seed=7,
+        )
+    
+    def load_state(self, state):
+        self.eval_tokens = state.input_ids[: state.n_tokens].tolist()
+        self.kv = bytes(state.llama_state)
+
+
+class TestKVState:
+    """Tests for LLMEngine.save_state/load_state."""
+    
+    @pytest.fixture
+    def engine(self, test_settings, tmp_path):
+        model_path = tmp_path / "model.gguf"
+        model_path.write_bytes(b"gguf")
+        engine = LLMEngine(test_settings.model_copy(update={"model_path": model_path}))
+        engine._model = StateLlama()
+        return engine
+    
+    def test_round_trip(self, engine, tmp_path):
+        """Test that a saved prefill is restored in a fresh model."""
+        state_path = tmp_path / "kv.bin"
+        engine.prefill("system")
+        engine.save_state(state_path, "system")
+        saved_kv = engine._model.kv
+        
+        engine._model = StateLlama()
+        
+        assert engine.load_state(state_path, "system") is True
+        assert engine._model.eval_tokens == [ord(c) for c in "system"]
+        assert engine._model.kv == saved_kv
+    
+    def test_stale_prompt_is_ignored(self, engine, tmp_path):
+        """Test that state saved for another prompt is not restored."""
+        state_path = tmp_path / "kv.bin"
+        engine.prefill("system")
+        engine.save_state(state_path, "system")
+        
+        engine._model = StateLlama()
+        
+        assert engine.load_state(state_path, "changed system") is False
+        assert engine._model.eval_tokens == []
+    
+    def test_missing_file(self, engine, tmp_path):
+        """Test that a missing state file is reported as not restored."""
+        assert engine.load_state(tmp_path / "missing.bin", "system") is False
+
+
+class ChatLlama(StateLlama):
+    """Fake llama.cpp model that, like llama.cpp, only evaluates the prompt
+    suffix after the prefix shared with the cached tokens."""
+    
+    def __init__(self, replies=()):
+        super().__init__()
+        self.replies = list(replies)
+        self.reused = []  # cached prefix length kept per prompt
+    
+    def n_ctx(self):
+        return 4096
+    
+    def _eval_prompt(self, tokens):
+        n = 0
+        while n < min(len(tokens), len(self.eval_tokens)) and tokens[n] == self.eval_tokens[n]:
+            n += 1
+        self.reused.append(n)
+        self.eval_tokens = self.eval_tokens[:n]
+        self.eval(tokens[n:])
+    
+    def __call__(self, prompt, **kwargs):
+        self._eval_prompt(self.tokenize(prompt.encode("utf-8")))
+        return {"choices": [{"text": self.replies.pop(0)}]}
+    
+    def generate(self, tokens, **kwargs):
+        self._eval_prompt(list(tokens))
+        for c in self.replies.pop(0):
+            yield ord(c)
+        yield self.EOS
+
+
+class TestSystemPromptReuse:
+    """Tests for keeping the system prompt KV cache through Agent.run."""
+    
+    def test_run_reuses_restored_system_prompt(self, test_settings, tmp_path):
+        """Test that the task list and step 1 both reuse the restored prefix."""
+        model_path = tmp_path / "model.gguf"
+        model_path.write_bytes(b"gguf")
+        settings = test_settings.model_copy(update={
+            "model_path": model_path,
+            "model_kv_state_path": tmp_path / "kv.bin",
+            "max_reasoning_steps": 1,
+        })
+        
+        # An earlier process prefilled the system prompt and saved the state
+        first = Agent(settings)
+        first.llm_engine._model = ChatLlama()
+        first._prefill_system_prompt()
+        
+        agent = Agent(settings)
+        model = agent.llm_engine._model = ChatLlama(["Task 1: List files", "Done."])
+        agent._prefill_system_prompt()
+        system_tokens = len(agent._system_tokens)
+        
+        results = agent.run("List the files")
+        
+        assert model.evaluated[0] != agent._system_tokens  # restored, not prefilled
+        assert len(results["reasoning_steps"]) == 1
+        # One prompt for the task list, one for step 1; neither re-evaluates it
+        assert len(model.reused) == 2
+        assert min(model.reused) >= system_tokens
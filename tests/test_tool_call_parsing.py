@@ -1,7 +1,10 @@
 """Tests for tool call parsing - focused on the identified issue."""
 
+import dataclasses
+import re
+
 import pytest
-from src.agent import Agent
+from src.agent import Agent, ToolCall
 from src.config import Settings
 
 
@@ -20,8 +23,8 @@ Getting the file list now."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 1
-        assert tool_calls[0]["name"] == "internet"
-        assert tool_calls[0]["args"]["url"] == "https://example.com/files"
+        assert tool_calls[0].name == "internet"
+        assert tool_calls[0].args["url"] == "https://example.com/files"
     
     def test_parse_tool_call_without_markers(self, test_settings):
         """Test parsing tool call without markers (just brackets)."""
@@ -35,8 +38,8 @@ Listing files now."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 1
-        assert tool_calls[0]["name"] == "terminal"
-        assert tool_calls[0]["args"]["command"] == "ls -la"
+        assert tool_calls[0].name == "terminal"
+        assert tool_calls[0].args["command"] == "ls -la"
     
     def test_parse_multiple_tool_calls(self, test_settings):
         """Test parsing multiple tool calls in one response."""
@@ -51,10 +54,10 @@ Done."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 2
-        assert tool_calls[0]["name"] == "terminal"
-        assert tool_calls[0]["args"]["command"] == "pwd"
-        assert tool_calls[1]["name"] == "internet"
-        assert tool_calls[1]["args"]["url"] == "https://api.example.com"
+        assert tool_calls[0].name == "terminal"
+        assert tool_calls[0].args["command"] == "pwd"
+        assert tool_calls[1].name == "internet"
+        assert tool_calls[1].args["url"] == "https://api.example.com"
     
     def test_parse_tool_call_with_single_quotes(self, test_settings):
         """Test parsing tool call with single quotes instead of double."""
@@ -66,8 +69,8 @@ Done."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 1
-        assert tool_calls[0]["name"] == "terminal"
-        assert tool_calls[0]["args"]["command"] == "ls -lah"
+        assert tool_calls[0].name == "terminal"
+        assert tool_calls[0].args["command"] == "ls -lah"
     
     def test_parse_ignores_plain_text_thought(self, test_settings):
         """Test that plain text thoughts are NOT parsed as tool calls."""
@@ -92,7 +95,7 @@ This is just text, not a tool call."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 1
-        assert tool_calls[0]["args"]["url"] == "https://api.example.com/data?id=123&format=json"
+        assert tool_calls[0].args["url"] == "https://api.example.com/data?id=123&format=json"
     
     def test_parse_tool_call_with_spaces_in_command(self, test_settings):
         """Test parsing tool call with spaces and special chars in command."""
@@ -104,9 +107,9 @@ This is just text, not a tool call."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 1
-        assert tool_calls[0]["name"] == "terminal"
+        assert tool_calls[0].name == "terminal"
         # Command should preserve internal quotes and special chars
-        assert "*.txt" in tool_calls[0]["args"]["command"]
+        assert "*.txt" in tool_calls[0].args["command"]
     
     def test_execute_tool_call_terminal(self, test_settings):
         """Test executing a terminal tool call."""
@@ -115,10 +118,7 @@ This is just text, not a tool call."""
         agent = Agent(test_settings)
         agent.load()
         
-        tool_call = {
-            "name": "terminal",
-            "args": {"command": "echo hello"}
-        }
+        tool_call = ToolCall("terminal", {"command": "echo hello"})
         
         result = agent._execute_tool_call(tool_call)
         
@@ -129,10 +129,7 @@ This is just text, not a tool call."""
         agent = Agent(test_settings)
         agent.load()
         
-        tool_call = {
-            "name": "terminal",
-            "args": {"command": "thisisnotarealcommand12345"}
-        }
+        tool_call = ToolCall("terminal", {"command": "thisisnotarealcommand12345"})
         
         result = agent._execute_tool_call(tool_call)
         
@@ -158,6 +155,120 @@ This is just text, not a tool call."""
         tool_calls = agent._parse_tool_calls(response)
         
         assert len(tool_calls) == 0
+    
+    def test_parse_tool_call_with_brackets_in_argument(self, test_settings):
+        """Test that ")]" inside a quoted argument does not end the call."""
+        agent = Agent(test_settings)
+        response = '<|tool_call_start|>[terminal(command="echo \')]\' done")]<|tool_call_end|>'
+        
+        tool_calls = agent._parse_tool_calls(response)
+        
+        assert tool_calls == [ToolCall("terminal", {"command": "echo ')]' done"})]
+    
+    @pytest.mark.parametrize("response", [
+        "[see(it's)] <|tool_call_start|>[terminal(command=\"ls\")]<|tool_call_end|>",
+        "[note(don't)] then [terminal(command=\"ls\")]",
+        "[note(don't)] then [terminal(command='ls')]",
+    ])
+    def test_parse_tool_call_after_apostrophe(self, test_settings, response):
+        """Test that an apostrophe in an earlier bracket does not hide later calls."""
+        agent = Agent(test_settings)
+        
+        assert agent._parse_tool_calls(response) == [ToolCall("terminal", {"command": "ls"})]
+    
+    @pytest.mark.parametrize("response", [
+        '<|tool_call_start|>[internet(url="https://example.com/a?b=1&c=2")]<|tool_call_end|>',
+        '[terminal(command="ls -la")] and [internet(url=\'https://example.com\')]',
+        '<|tool_call_start|>[terminal(command="find . -name \'*.txt\'")]<|tool_call_end|>',
+        '[terminal( command = "echo \\"hi\\"" )]',
+        "I think [this is just text] about the problem.",
+    ])
+    def test_scan_matches_regex_oracle(self, response):
+        """Test that the scanner agrees with a regex reading of well-formed calls."""
+        from src.agent import _scan_tool_calls
+        
+        call_re = re.compile(
+            r'(<\|tool_call_start\|>\s*)?\[(\w+)\s*\((.*?)\)\](?(1)\s*<\|tool_call_end\|>)',
+            re.DOTALL,
+        )
+        arg_re = re.compile(r'(\w+)\s*=\s*(?:"((?:[^"\\]|\\.)*)"|\'((?:[^\'\\]|\\.)*)\')')
+        expected = [
+            (
+                bool(call.group(1)),
+                call.group(2),
+                {arg.group(1): arg.group(2) if arg.group(2) is not None else arg.group(3)
+                 for arg in arg_re.finditer(call.group(3))},
+            )
+            for call in call_re.finditer(response)
+        ]
+        
+        assert _scan_tool_calls(response) == expected
+    
+    def test_parse_tool_calls_are_read_only(self, test_settings):
+        """Test that parsed calls cannot be changed, so repeated parses agree."""
+        agent = Agent(test_settings)
+        response = '[terminal(command="ls")]'
+        
+        first = agent._parse_tool_calls(response)
+        with pytest.raises(TypeError):
+            first[0].args["command"] = "rm -rf /"
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            first[0].name = "internet"
+        
+        assert agent._parse_tool_calls(response) == [
+            ToolCall("terminal", {"command": "ls"})
+        ]
+    
+    def test_tool_call_hashes_and_serializes(self):
+        """Test that tool calls work as dict keys and through asdict()/orjson."""
+        import orjson
+        
+        tool_call = ToolCall("terminal", {"command": "ls"})
+        
+        assert {tool_call: 1}[ToolCall("terminal", {"command": "ls"})] == 1
+        assert dataclasses.asdict(tool_call) == {
+            "name": "terminal", "arguments": (("command", "ls"),), "_args": {"command": "ls"}
+        }
+        assert orjson.loads(orjson.dumps(dataclasses.asdict(tool_call)))["arguments"] == [
+            ["command", "ls"]
+        ]
+    
+    def test_tool_call_args_are_built_once(self):
+        """Test that args wraps one stored dict instead of copying per access."""
+        tool_call = ToolCall("terminal", {"command": "ls"})
+        args = tool_call.args
+        
+        # A view of the stored dict sees changes to it; a copy would not
+        tool_call._args["extra"] = "x"
+        
+        assert args["extra"] == "x"
+        assert dataclasses.replace(tool_call).args == {"command": "ls"}
+        assert "_args" not in repr(tool_call)
+    
+    def test_parse_tool_calls_interns_names(self, test_settings):
+        """Test that parsed tool names and argument keys are interned."""
+        import sys
+        
+        agent = Agent(test_settings)
+        
+        tool_call, = agent._parse_tool_calls('[internet(url="https://example.com")]')
+        
+        assert tool_call.name is sys.intern("internet")
+        assert next(iter(tool_call.args)) is sys.intern("url")
+    
+    def test_parse_tool_calls_skips_scan_without_brackets(self, test_settings):
+        """Test that responses with no "[" are not scanned or cached."""
+        from src.agent import _cached_tool_calls
+        
+        agent = Agent(test_settings)
+        before = _cached_tool_calls.cache_info()
+        
+        assert agent._parse_tool_calls("") == []
+        assert agent._parse_tool_calls("The files are listed above.") == []
+        
+        after = _cached_tool_calls.cache_info()
+        assert (after.hits, after.misses) == (before.hits, before.misses)
+    
 
 
 class TestToolCallIntegration:
@@ -1,8 +1,17 @@
 """Tests for agent tools."""
 
+import dataclasses
+import io
+import shutil
+import subprocess
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import httpx
 import pytest
+import requests
 
-from src.tools import TerminalTool, InternetTool, ToolResult
+from src.tools import MAX_OUTPUT_BYTES, AsyncInternetTool, TerminalTool, InternetTool, ToolResult
 
 
 class TestTerminalTool:
@@ -25,6 +34,14 @@ class TestTerminalTool:
         assert "test" in result.output
         assert result.error is None
     
+    def test_terminal_tool_shell_syntax(self):
+        """Test that commands needing a shell still get one."""
+        tool = TerminalTool(enabled=True)
+        result = tool.execute("echo one | tr o 0")
+        
+        assert result.success is True
+        assert result.output == "0ne"
+    
     def test_terminal_tool_invalid_command(self):
         """Test invalid command."""
         tool = TerminalTool(enabled=True)
@@ -33,14 +50,247 @@ class TestTerminalTool:
         assert result.success is False
         assert result.error is not None
     
-    def test_terminal_tool_timeout(self):
+    def test_terminal_tool_timeout(self, monkeypatch):
         """Test command timeout."""
+        killed = []
+        
+        class FakeProcess:
+            """A command that is still running when the timeout expires."""
+            
+            def __init__(self, *args, **kwargs):
+                self.stdout = io.BytesIO(b"partial\n")
+                self.stderr = io.BytesIO()
+            
+            def wait(self, timeout=None):
+                if not killed:
+                    raise subprocess.TimeoutExpired(cmd="x", timeout=timeout)
+                return -9
+        
+        # No real process: only the timeout handling is under test
+        monkeypatch.setattr("src.tools.subprocess.Popen", FakeProcess)
+        monkeypatch.setattr("src.tools._kill_process_tree", killed.append)
         tool = TerminalTool(enabled=True)
-        # This command will timeout on Windows
         result = tool.execute("timeout /t 5", timeout=1)
         
         assert result.success is False
-        assert "timeout" in result.error.lower()
+        assert "timed out" in result.error.lower()
+        assert result.output == "partial"
+        assert len(killed) == 1
+    
+    def test_terminal_tool_caps_output(self):
+        """Test that a command printing without end is killed at the output cap."""
+        tool = TerminalTool(enabled=True)
+        result = tool.execute("yes", timeout=10)
+        
+        assert result.success is False
+        assert "exceeded" in result.error
+        assert 0 < len(result.output) <= MAX_OUTPUT_BYTES
+    
+    def test_terminal_tool_timeout_keeps_partial_output(self):
+        """Test that a timed out command returns what it printed so far."""
+        tool = TerminalTool(enabled=True)
+        result = tool.execute("echo started; sleep 5", timeout=1)
+        
+        assert result.success is False
+        assert "timed out" in result.error
+        assert result.output == "started"
+    
+    def test_terminal_tool_caches_successful_results(self, tmp_path):
+        """Test that a cacheable tool reuses successes and reruns failures."""
+        marker = tmp_path / "marker.txt"
+        tool = TerminalTool(enabled=True, cacheable=True)
+        command = f"cat {marker}"
+        
+        assert tool.execute(command).success is False
+        marker.write_text("first")
+        first = tool.execute(command)
+        marker.write_text("second")
+        
+        assert first.output == "first"
+        assert tool.execute(command) is first
+
+
+class TestTerminalToolAsync:
+    """Tests for TerminalTool.aexecute."""
+    
+    @pytest.mark.asyncio
+    async def test_aexecute_simple_command(self):
+        """Test simple terminal command."""
+        tool = TerminalTool(enabled=True)
+        result = await tool.aexecute("echo test")
+        
+        assert result.success is True
+        assert result.output == "test"
+        assert result.error is None
+    
+    @pytest.mark.asyncio
+    async def test_aexecute_shell_syntax(self):
+        """Test that commands using shell syntax still go through the shell."""
+        tool = TerminalTool(enabled=True)
+        result = await tool.aexecute("echo one && echo two")
+        
+        assert result.success is True
+        assert result.output.split() == ["one", "two"]
+    
+    @pytest.mark.asyncio
+    @pytest.mark.parametrize("command", ["type ls", "command -v ls"])
+    async def test_aexecute_shell_builtin(self, command):
+        """Test that commands only the shell knows still go through the shell."""
+        tool = TerminalTool(enabled=True)
+        result = await tool.aexecute(command)
+        
+        assert result.success is True
+        assert "ls" in result.output
+    
+    @pytest.mark.asyncio
+    async def test_aexecute_invalid_command(self):
+        """Test invalid command."""
+        tool = TerminalTool(enabled=True)
+        result = await tool.aexecute("nonexistent_command_xyz123")
+        
+        assert result.success is False
+        assert result.error is not None
+    
+    @pytest.mark.asyncio
+    async def test_aexecute_caps_output(self):
+        """Test that async execution kills a command at the output cap."""
+        tool = TerminalTool(enabled=True)
+        result = await tool.aexecute("yes", timeout=10)
+        
+        assert result.success is False
+        assert "exceeded" in result.error
+        assert 0 < len(result.output) <= MAX_OUTPUT_BYTES
+    
+    @pytest.mark.asyncio
+    async def test_aexecute_disabled(self):
+        """Test async execution when disabled."""
+        tool = TerminalTool(enabled=False)
+        result = await tool.aexecute("echo test")
+        
+        assert result.success is False
+        assert "disabled" in result.error.lower()
+
+
+@pytest.mark.skipif(shutil.which("bash") is None, reason="persistent shell needs bash")
+class TestPersistentShell:
+    """Tests for TerminalTool's persistent shell."""
+    
+    @pytest.fixture
+    def tool(self):
+        tool = TerminalTool(enabled=True)
+        tool.start_persistent()
+        yield tool
+        tool.stop_persistent()
+    
+    def test_shell_starts_on_first_command(self):
+        """Test that a persistent tool only spawns its shell when first used."""
+        tool = TerminalTool(enabled=True, persistent=True)
+        assert tool._shell is None
+        
+        result = tool.execute("echo test")
+        
+        assert result.output == "test"
+        assert tool._shell is not None
+        tool.stop_persistent()
+    
+    def test_unbalanced_quote_fails_fast(self, tool):
+        """Test that a command with an open quote does not hang the shell."""
+        result = tool.execute('echo "abc', timeout=5)
+        
+        assert result.success is False
+        assert "timed out" not in result.error
+        assert tool.execute("echo ok").output == "ok"
+    
+    def test_state_persists_between_commands(self, tool, tmp_path):
+        """Test that commands share one shell."""
+        tool.execute(f"cd {tmp_path}")
+        result = tool.execute("pwd")
+        
+        assert result.success is True
+        assert result.output == str(tmp_path)
+    
+    def test_fallback_uses_shell_directory(self, tool, tmp_path):
+        """Test that commands outside the persistent shell use its directory."""
+        tool.execute(f"cd {tmp_path}")
+        
+        with tool._shell_lock:
+            result = tool.execute("pwd")
+        
+        assert result.output == str(tmp_path)
+    
+    def test_failed_command_reports_stderr(self, tool):
+        """Test that the exit status and stderr of a failed command are returned."""
+        result = tool.execute("echo out; echo err >&2; false")
+        
+        assert result.success is False
+        assert result.output == "out"
+        assert result.error == "err"
+    
+    def test_timeout_restarts_shell(self, tool):
+        """Test that a timed out command does not block later commands."""
+        result = tool.execute("sleep 5", timeout=1)
+        
+        assert result.success is False
+        assert "timed out" in result.error
+        assert tool.execute("echo ok").output == "ok"
+    
+    def test_output_cap_restarts_shell(self, tool):
+        """Test that a command printing without end is stopped at the output cap."""
+        result = tool.execute("yes", timeout=10)
+        
+        assert result.success is False
+        assert "exceeded" in result.error
+        assert 0 < len(result.output) <= MAX_OUTPUT_BYTES
+        assert tool.execute("echo ok").output == "ok"
+    
+    def test_exit_restarts_shell(self, tool):
+        """Test that a command exiting the shell does not break the tool."""
+        result = tool.execute("exit 3")
+        
+        assert result.success is False
+        assert tool.execute("echo ok").output == "ok"
+
+
+class _FakeResponse:
+    """Streamed requests.Response stand-in."""
+    
+    encoding = "utf-8"
+    
+    def __init__(self, status_code=200, headers=None, body=b"hello"):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.body = body
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, *exc_info):
+        return False
+    
+    def raise_for_status(self):
+        pass
+    
+    def iter_content(self, chunk_size):
+        yield self.body
+
+
+class _FakeSession:
+    """requests.Session stand-in that records GETs and answers them with respond."""
+    
+    def __init__(self, respond=lambda url, headers: _FakeResponse()):
+        self.respond = respond
+        self.requests = []  # (url, headers) per GET
+        self.closed = False
+    
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, headers))
+        return self.respond(url, headers or {})
+    
+    def urls(self):
+        return [url for url, _ in self.requests]
+    
+    def close(self):
+        self.closed = True
 
 
 class TestInternetTool:
@@ -62,15 +312,234 @@ class TestInternetTool:
         assert result.success is False
         assert result.error is not None
     
+    def test_internet_tool_reuses_session(self):
+        """Test that requests go through the tool's session."""
+        session = _FakeSession()
+        tool = InternetTool(enabled=True, session=session)
+        
+        assert tool.get("https://example.com/a").output == "hello"
+        assert tool.get("https://example.com/b").output == "hello"
+        assert session.urls() == ["https://example.com/a", "https://example.com/b"]
+    
+    def test_internet_tools_share_default_session(self):
+        """Test that tools without their own session share one pool."""
+        first = InternetTool(enabled=True)
+        second = InternetTool(enabled=True)
+        
+        assert first.session is second.session
+        assert InternetTool(enabled=True, pool_maxsize=4).session is not first.session
+    
+    def test_internet_tool_close_detaches_shared_session(self, monkeypatch):
+        """Test that close() leaves the shared session open for other tools."""
+        first = InternetTool(enabled=True)
+        second = InternetTool(enabled=True)
+        shared = first.session
+        closed = []
+        monkeypatch.setattr(shared, "close", lambda: closed.append(shared))
+        
+        first.close()
+        
+        assert closed == []
+        assert second.session is shared
+        assert first.session is shared
+    
+    def test_internet_tool_leaves_given_session_open(self):
+        """Test that close() leaves a caller's session open but drops cached responses."""
+        session = _FakeSession()
+        tool = InternetTool(enabled=True, session=session)
+        tool.get("https://example.com")
+        
+        tool.close()
+        tool.get("https://example.com")
+        
+        assert session.closed is False
+        assert tool.session is session
+        assert session.urls() == ["https://example.com", "https://example.com"]
+    
+    def test_shared_session_keeps_no_cookies(self):
+        """Test that a cookie set for one tool is not sent by another."""
+        cookies = []
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                cookies.append(self.headers.get("Cookie"))
+                self.send_response(200)
+                self.send_header("Set-Cookie", "session=secret; Path=/")
+                self.send_header("Cache-Control", "no-store")
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+            
+            def log_message(self, *args):
+                pass
+        
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/"
+            InternetTool(enabled=True).get(url)
+            InternetTool(enabled=True).get(url)
+        finally:
+            server.shutdown()
+        
+        assert cookies == [None, None]
+    
+    def test_internet_tool_revalidates_with_etag(self):
+        """Test that a 304 for a cached ETag returns the cached body."""
+        def respond(url, headers):
+            if headers.get("If-None-Match") == '"v1"':
+                return _FakeResponse(304, body=b"")
+            return _FakeResponse(headers={"ETag": '"v1"', "Cache-Control": "no-cache"}, body=b"cached body")
+        
+        session = _FakeSession(respond)
+        tool = InternetTool(enabled=True, session=session)
+        
+        first = tool.get("https://example.com")
+        second = tool.get("https://example.com")
+        
+        assert [headers for _, headers in session.requests] == [{}, {"If-None-Match": '"v1"'}]
+        assert first.output == second.output == "cached body"
+    
+    def test_internet_tool_reuses_fresh_response(self):
+        """Test that a repeated GET within the TTL sends no request, unless no-store."""
+        def respond(url, headers):
+            cache_control = "no-store" if url.endswith("/private") else "max-age=300"
+            return _FakeResponse(headers={"Cache-Control": cache_control})
+        
+        session = _FakeSession(respond)
+        tool = InternetTool(enabled=True, session=session)
+        
+        for _ in range(3):
+            assert tool.get("https://example.com/page").output == "hello"
+            assert tool.get("https://example.com/private").output == "hello"
+        
+        assert session.urls().count("https://example.com/page") == 1
+        assert session.urls().count("https://example.com/private") == 3
+    
+    def test_internet_tool_retries_transient_status(self):
+        """Test that a 503 is retried and the following success returned."""
+        statuses = [503, 200]
+        
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                self.send_response(statuses.pop(0))
+                self.send_header("Content-Length", "2")
+                self.end_headers()
+                self.wfile.write(b"ok")
+            
+            def log_message(self, *args):
+                pass
+        
+        server = HTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            tool = InternetTool(enabled=True)
+            result = tool.get(f"http://127.0.0.1:{server.server_port}/")
+            tool.close()
+        finally:
+            server.shutdown()
+        
+        assert result.success is True
+        assert result.output == "ok"
+        assert statuses == []
+    
     def test_internet_tool_timeout(self):
         """Test request timeout."""
-        tool = InternetTool(enabled=True)
-        # Use a URL that will timeout
-        result = tool.get("https://httpstat.us/200?sleep=5000", timeout=1)
+        class TimeoutSession:
+            def get(self, url, timeout=None, **kwargs):
+                raise requests.exceptions.ReadTimeout(f"Read timed out. (read timeout={timeout})")
+        
+        tool = InternetTool(enabled=True, session=TimeoutSession())
+        result = tool.get("https://example.com/slow", timeout=1)
+        
+        assert result.success is False
+        assert "timed out" in result.error.lower()
+
+
+class TestAsyncInternetTool:
+    """Tests for AsyncInternetTool."""
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_disabled(self):
+        """Test async internet tool when disabled."""
+        tool = AsyncInternetTool(enabled=False)
+        result = await tool.get("https://example.com")
+        
+        assert result.success is False
+        assert "disabled" in result.error.lower()
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_truncates_body(self):
+        """Test that only max_bytes of the body are returned."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(200, content=b"x" * 100))
+        tool = AsyncInternetTool(client=httpx.AsyncClient(transport=transport))
+        
+        result = await tool.get("https://example.com", max_bytes=10)
+        await tool.aclose()
+        
+        assert result.success is True
+        assert result.output == "x" * 10
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_caches_get(self):
+        """Test that a repeated GET is answered from the cache within the TTL."""
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=b"hello")
+        
+        transport = httpx.MockTransport(handler)
+        tool = AsyncInternetTool(client=httpx.AsyncClient(transport=transport))
+        
+        first = await tool.get("https://example.com")
+        second = await tool.get("https://example.com")
+        await tool.aclose()
+        
+        assert first.output == second.output == "hello"
+        assert len(requests_seen) == 1
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_post_truncates_body(self):
+        """Test that POST responses are also read only up to max_bytes."""
+        requests_seen = []
+        
+        def handler(request):
+            requests_seen.append(request)
+            return httpx.Response(200, content=b"y" * 100)
+        
+        transport = httpx.MockTransport(handler)
+        tool = AsyncInternetTool(client=httpx.AsyncClient(transport=transport))
+        
+        result = await tool.post("https://example.com", data={"q": 1}, max_bytes=10)
+        await tool.aclose()
+        
+        assert result.success is True
+        assert result.output == "y" * 10
+        assert requests_seen[0].headers["Content-Type"] == "application/json"
+        assert requests_seen[0].content == b'{"q":1}'
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_http_error(self):
+        """Test that HTTP error statuses are reported as failures."""
+        transport = httpx.MockTransport(lambda request: httpx.Response(404))
+        tool = AsyncInternetTool(client=httpx.AsyncClient(transport=transport))
+        
+        result = await tool.get("https://example.com/missing")
+        await tool.aclose()
+        
+        assert result.success is False
+        assert "404" in result.error
+    
+    @pytest.mark.asyncio
+    async def test_async_internet_tool_invalid_url(self):
+        """Test with invalid URL."""
+        tool = AsyncInternetTool(enabled=True)
+        result = await tool.get("not_a_valid_url")
+        await tool.aclose()
         
         assert result.success is False
-        if result.error:
-            assert "timeout" in result.error.lower() or "timed out" in result.error.lower()
+        assert result.error is not None
 
 
 class TestToolResult:
@@ -91,3 +560,10 @@ class TestToolResult:
         assert result.success is False
         assert result.output == ""
         assert result.error == "test error"
+    
+    def test_tool_result_is_immutable(self):
+        """Test that tool results cannot be modified after creation."""
+        result = ToolResult(success=True, output="test output")
+        
+        with pytest.raises(dataclasses.FrozenInstanceError):
+            result.output = "changed"